@@ -268,7 +268,8 @@ def extract_metadata(
     except DriveUploadError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
     try:
-        metadata = GeminiService().extract_metadata(pdf_bytes)
+        # An explicit request is a retry, so skip results cached by background enrichment.
+        metadata = GeminiService().extract_metadata(pdf_bytes, use_cache=False)
     except ValueError as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
     return {"metadata": metadata}
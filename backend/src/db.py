@@ -132,6 +132,14 @@ def create_tables() -> None:
         conn.execute(text(_add_batch_progress_sql))
         conn.commit()
 
+    # Add response_offset column to batch_jobs if it was created before this column existed.
+    _add_batch_offset_sql = """
+    ALTER TABLE batch_jobs ADD COLUMN IF NOT EXISTS response_offset INTEGER NOT NULL DEFAULT 0;
+    """
+    with engine.connect() as conn:
+        conn.execute(text(_add_batch_offset_sql))
+        conn.commit()
+
     # Add metadata_skip_reason column to papers if it was created before this column existed.
     _add_skip_reason_sql = """
     ALTER TABLE papers ADD COLUMN IF NOT EXISTS metadata_skip_reason TEXT;
@@ -103,6 +103,13 @@ def startup() -> None:
         db.close()
 
 
+@app.on_event("shutdown")
+def shutdown() -> None:
+    from src.services.batch_metadata import shutdown as shutdown_batch_loop
+
+    shutdown_batch_loop()
+
+
 @app.exception_handler(Exception)
 async def _global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     # Import here to avoid circular imports at module level.
@@ -21,5 +21,8 @@ class BatchJob(Base):
     state: Mapped[str] = mapped_column(Text, nullable=False)
     paper_ids: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False, server_default="{}")
     papers_done: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    # Index of this job's first paper within the Gemini batch's inlined responses
+    # (several BatchJob rows may share one gemini_job_name).
+    response_offset: Mapped[int] = mapped_column(nullable=False, server_default="0")
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=func.now())
     completed_at: Mapped[datetime | None] = mapped_column(nullable=True)
@@ -1,11 +1,11 @@
 """Batch metadata extraction service — background loop using the Gemini Batch API."""
 
-import json
+import hashlib
 import logging
 import os
 import threading
-import time
 import uuid
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import UTC, datetime
@@ -20,13 +20,21 @@ from src.models.paper import Paper
 from src.schemas.batch import BatchLoopStatus
 from src.schemas.paper import ExtractedMetadata
 from src.services.drive import DriveService, DriveUploadError
-from src.services.gemini import _MAX_PAGES, _PROMPT, _extract_first_pages_text
+from src.services.gemini import (
+    _MAX_PAGES,
+    _PROMPT,
+    _extract_first_pages_text,
+    _parse_metadata,
+)
 
 logger = logging.getLogger(__name__)
 
 COST_PER_PAPER_USD = 0.005
 _CHUNK_SIZE = 20
+# Number of chunks aggregated into one Gemini batch submission.
+_CHUNKS_PER_SUBMIT = 10
 _POLL_INTERVAL_SECONDS = 300
+_CACHE_MAX_ENTRIES = 256
 
 # ── Module-level loop state ───────────────────────────────────────────────────
 
@@ -34,6 +42,19 @@ _running = False
 _papers_done = 0
 _poll_thread: threading.Thread | None = None
 _lock = threading.Lock()
+# Separate lock for the progress counter so poll-thread increments do not contend
+# with is_running() checks. Plain int reads are atomic under the GIL.
+_papers_done_lock = threading.Lock()
+# Cleared at the start of each poll tick; set by _ensure_poll_thread() when jobs arrive
+# while the poll thread is alive, so the thread re-checks instead of exiting.
+_poll_pending = False
+# Set by shutdown() to wake the poll thread immediately instead of after a full interval.
+_shutdown_event = threading.Event()
+
+# In-process LRU of metadata keyed by a hash of the normalised first-pages text,
+# so re-uploaded copies of the same paper skip the Gemini batch round-trip.
+_metadata_cache: OrderedDict[str, ExtractedMetadata] = OrderedDict()
+_pending_text_keys: dict[str, str] = {}  # paper_id -> cache key, awaiting batch results
 
 
 def is_running() -> bool:
@@ -42,8 +63,7 @@ def is_running() -> bool:
 
 
 def get_status() -> BatchLoopStatus:
-    with _lock:
-        return BatchLoopStatus(running=_running, papers_done=_papers_done)
+    return BatchLoopStatus(running=is_running(), papers_done=_papers_done)
 
 
 def start_loop() -> BatchLoopStatus:
@@ -53,16 +73,35 @@ def start_loop() -> BatchLoopStatus:
         if _running:
             return BatchLoopStatus(running=True, papers_done=_papers_done)
         _running = True
-        _papers_done = 0
+        with _papers_done_lock:
+            _papers_done = 0
     threading.Thread(target=_loop, daemon=True).start()
     return BatchLoopStatus(running=True, papers_done=0)
 
 
 def stop_loop() -> BatchLoopStatus:
+    """Stop submitting new batches. Already-submitted batches are still polled and applied."""
+    return _mark_stopped()
+
+
+def shutdown() -> None:
+    """Stop the background loop and wake the poll thread so it exits promptly."""
+    _mark_stopped()
+    _shutdown_event.set()
+
+
+def _mark_stopped() -> BatchLoopStatus:
+    """Clear the running flag; the poll thread is unaffected."""
     global _running
     with _lock:
         _running = False
-        return BatchLoopStatus(running=False, papers_done=_papers_done)
+    return BatchLoopStatus(running=False, papers_done=_papers_done)
+
+
+def _add_papers_done(n: int) -> None:
+    global _papers_done
+    with _papers_done_lock:
+        _papers_done += n
 
 
 def _loop() -> None:
@@ -77,7 +116,7 @@ def _loop() -> None:
         client, model_name = _get_gemini_client()
     except ValueError as exc:
         logger.error("batch loop: %s", exc)
-        stop_loop()
+        _mark_stopped()
         return
 
     logger.info("batch loop started")
@@ -95,13 +134,15 @@ def _loop() -> None:
                 str(p.id)
                 for p in db.query(Paper).all()
                 if _is_eligible(p) and str(p.id) not in in_flight
-            ][:_CHUNK_SIZE]
+            ][: _CHUNK_SIZE * _CHUNKS_PER_SUBMIT]
             if not chunk:
                 logger.info("batch loop: no eligible papers remaining, stopping")
-                stop_loop()
+                _mark_stopped()
+                if in_flight:
+                    _ensure_poll_thread(client, session_factory)
                 break
-            job = _submit_chunk(chunk, client, model_name, db)
-            if job is not None:
+            jobs = _submit_chunks(chunk, client, model_name, db)
+            if jobs:
                 _ensure_poll_thread(client, session_factory)
         except Exception as exc:
             logger.error("batch loop: chunk failed: %s", exc)
@@ -136,9 +177,11 @@ def _ensure_poll_thread(
     session_factory: Callable[[], Session],
 ) -> None:
     """Start the shared poll thread if it is not already running."""
-    global _poll_thread
+    global _poll_thread, _poll_pending
     with _lock:
         if _poll_thread is not None and _poll_thread.is_alive():
+            # The live thread may be about to exit having seen no jobs; make it re-check.
+            _poll_pending = True
             return
         t = threading.Thread(
             target=_poll_loop_thread,
@@ -154,48 +197,53 @@ def _poll_loop_thread(
     session_factory: Callable[[], Session],
 ) -> None:
     """Single background thread: poll all submitted batch jobs on each tick and apply results."""
-    global _papers_done
+    global _poll_pending
     logger.info("poll loop started")
     try:
         while True:
-            time.sleep(_POLL_INTERVAL_SECONDS)
+            if _shutdown_event.wait(_POLL_INTERVAL_SECONDS):
+                break
+            with _lock:
+                _poll_pending = False
             db = session_factory()
             try:
                 jobs = db.query(BatchJob).filter(BatchJob.state == "submitted").all()
                 if not jobs:
+                    if _should_keep_polling():
+                        continue
                     logger.info("poll loop: no submitted jobs remain, stopping")
                     break
 
+                # Several BatchJob rows can share one Gemini batch — fetch each batch once
+                jobs_by_name: dict[str, list[BatchJob]] = defaultdict(list)
+                for job in jobs:
+                    jobs_by_name[job.gemini_job_name].append(job)
+
                 # Fetch all batch statuses concurrently (pure I/O)
-                with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                with ThreadPoolExecutor(max_workers=len(jobs_by_name)) as pool:
                     batch_futures = {
-                        pool.submit(client.batches.get, name=job.gemini_job_name): job
-                        for job in jobs
+                        pool.submit(client.batches.get, name=name): name for name in jobs_by_name
                     }
                     for fut in as_completed(batch_futures):
-                        job = batch_futures[fut]
+                        name = batch_futures[fut]
                         try:
                             batch = fut.result()
                         except Exception as exc:
-                            logger.error(
-                                "poll loop: failed to fetch batch %s: %s",
-                                job.gemini_job_name,
-                                exc,
-                            )
+                            logger.error("poll loop: failed to fetch batch %s: %s", name, exc)
                             continue
                         logger.info(
                             "batch %s state: %s",
-                            job.gemini_job_name,
+                            name,
                             batch.state.name if batch.state is not None else "unknown",
                         )
                         if not batch.done:
                             continue
-                        try:
-                            applied = _apply_batch_results(job, batch, db)
-                            with _lock:
-                                _papers_done += applied
-                        except Exception as exc:
-                            logger.error("poll loop: failed to apply job %s: %s", job.id, exc)
+                        for job in jobs_by_name[name]:
+                            try:
+                                applied = _apply_batch_results(job, batch, db)
+                                _add_papers_done(applied)
+                            except Exception as exc:
+                                logger.error("poll loop: failed to apply job %s: %s", job.id, exc)
             except Exception as exc:
                 logger.error("poll loop: tick failed: %s", exc)
             finally:
@@ -206,6 +254,18 @@ def _poll_loop_thread(
         logger.info("poll loop stopped")
 
 
+def _should_keep_polling() -> bool:
+    """Return True if jobs were submitted since this tick began; else release the thread slot."""
+    global _poll_thread, _poll_pending
+    with _lock:
+        if _poll_pending:
+            _poll_pending = False
+            return True
+        if _poll_thread is threading.current_thread():
+            _poll_thread = None
+        return False
+
+
 # ── Core chunk functions ──────────────────────────────────────────────────────
 
 
@@ -214,22 +274,11 @@ def _download_pdf_bytes(pid: str, paper: Paper) -> tuple[str, bytes]:
     return pid, DriveService().download(paper.drive_file_id)
 
 
-def _submit_chunk(
-    chunk_ids: list[str],
-    client: genai.Client,
-    model_name: str,
-    db: Session,
-) -> BatchJob | None:
-    """Download PDFs in parallel, extract text sequentially, submit to Gemini Batch API."""
-    papers_by_id = {str(p.id): p for p in db.query(Paper).filter(Paper.id.in_(chunk_ids)).all()}
-
-    # Download raw bytes concurrently (pure I/O — safe to parallelise)
+def _download_slice(pids: list[str], papers_by_id: dict[str, Paper]) -> dict[str, bytes]:
+    """Download PDFs for up to _CHUNK_SIZE papers concurrently; failed downloads are skipped."""
     pdf_bytes_by_id: dict[str, bytes] = {}
-    eligible_ids = [pid for pid in chunk_ids if pid in papers_by_id]
-    with ThreadPoolExecutor(max_workers=len(eligible_ids) or 1) as pool:
-        futures = {
-            pool.submit(_download_pdf_bytes, pid, papers_by_id[pid]): pid for pid in eligible_ids
-        }
+    with ThreadPoolExecutor(max_workers=min(len(pids), _CHUNK_SIZE) or 1) as pool:
+        futures = {pool.submit(_download_pdf_bytes, pid, papers_by_id[pid]): pid for pid in pids}
         for fut in as_completed(futures):
             pid = futures[fut]
             try:
@@ -237,60 +286,106 @@ def _submit_chunk(
                 pdf_bytes_by_id[pid] = pdf_bytes
             except DriveUploadError as exc:
                 logger.warning("skipping paper %s — drive download failed: %s", pid, exc)
+    return pdf_bytes_by_id
+
+
+def _submit_chunks(
+    chunk_ids: list[str],
+    client: genai.Client,
+    model_name: str,
+    db: Session,
+) -> list[BatchJob]:
+    """Download PDFs and extract text per _CHUNK_SIZE slice, then submit one Gemini batch.
+
+    All papers go into a single Gemini batch; one BatchJob row is persisted per
+    _CHUNK_SIZE slice, each recording its offset into the batch's responses.
+    Papers whose text matches a cached extraction are resolved without Gemini.
+    """
+    papers_by_id = {str(p.id): p for p in db.query(Paper).filter(Paper.id.in_(chunk_ids)).all()}
+    eligible_ids = [pid for pid in chunk_ids if pid in papers_by_id]
 
-    # Extract text sequentially (pdfplumber uses C extensions — not thread-safe)
     # Build requests in chunk_ids order to preserve index-to-paper mapping
     inline_requests: list[dict[str, object]] = []
     resolved_ids: list[str] = []
-    for pid in chunk_ids:
-        if pid not in pdf_bytes_by_id:
-            continue
-        paper = papers_by_id[pid]
-        try:
-            text, _ = _extract_first_pages_text(pdf_bytes_by_id[pid], _MAX_PAGES)
-        except Exception as exc:
-            reason = str(exc)
-            logger.warning("skipping paper %s permanently — text extraction failed: %s", pid, exc)
-            paper.metadata_skip_reason = reason
-            db.commit()
-            continue
-        logger.info("extracted text for paper %s (%s)", pid, paper.title[:60])
-        inline_requests.append(
-            {
-                "contents": [
-                    {
-                        "parts": [{"text": _PROMPT + "\n\n" + text}],
-                        "role": "user",
-                    }
-                ]
-            }
-        )
-        resolved_ids.append(pid)
+    for start in range(0, len(eligible_ids), _CHUNK_SIZE):
+        slice_ids = eligible_ids[start : start + _CHUNK_SIZE]
+        # Download raw bytes concurrently (pure I/O — safe to parallelise); only one
+        # slice of PDFs is held in memory at a time.
+        pdf_bytes_by_id = _download_slice(slice_ids, papers_by_id)
+
+        # Extract text sequentially (pdfplumber uses C extensions — not thread-safe)
+        for pid in slice_ids:
+            pdf_bytes = pdf_bytes_by_id.pop(pid, None)
+            if pdf_bytes is None:
+                continue
+            paper = papers_by_id[pid]
+            try:
+                text, _ = _extract_first_pages_text(pdf_bytes, _MAX_PAGES)
+            except Exception as exc:
+                reason = str(exc)
+                logger.warning(
+                    "skipping paper %s permanently — text extraction failed: %s", pid, exc
+                )
+                paper.metadata_skip_reason = reason
+                db.commit()
+                continue
+            logger.info("extracted text for paper %s (%s)", pid, paper.title[:60])
+            key = _text_cache_key(text)
+            cached = _cache_get(key)
+            if cached is not None:
+                _apply_metadata(paper, cached)
+                if not _is_eligible(paper):
+                    logger.info("metadata cache hit for paper %s", pid)
+                    db.commit()
+                    _add_papers_done(1)
+                    continue
+            with _lock:
+                _pending_text_keys[pid] = key
+            inline_requests.append(
+                {
+                    "contents": [
+                        {
+                            "parts": [{"text": _PROMPT + "\n\n" + text}],
+                            "role": "user",
+                        }
+                    ]
+                }
+            )
+            resolved_ids.append(pid)
 
     if not inline_requests:
-        return None
-
-    logger.info("submitting Gemini chunk of %d papers", len(inline_requests))
-    batch = client.batches.create(
-        model=model_name,
-        src=inline_requests,  # type: ignore[arg-type]
-        config={"display_name": "paperstore-metadata-chunk"},
-    )
+        return []
+
+    logger.info("submitting Gemini batch of %d papers", len(inline_requests))
+    try:
+        batch = client.batches.create(
+            model=model_name,
+            src=inline_requests,  # type: ignore[arg-type]
+            config={"display_name": "paperstore-metadata-chunk"},
+        )
+    except Exception:
+        _take_pending_keys(resolved_ids)
+        raise
     batch_name = batch.name or ""
     logger.info("Gemini batch created: %s", batch_name)
 
-    job = BatchJob(
-        id=uuid.uuid4(),
-        gemini_job_name=batch_name,
-        state="submitted",
-        paper_ids=resolved_ids,
-        papers_done=0,
-    )
-    db.add(job)
+    jobs = [
+        BatchJob(
+            id=uuid.uuid4(),
+            gemini_job_name=batch_name,
+            state="submitted",
+            paper_ids=resolved_ids[offset : offset + _CHUNK_SIZE],
+            papers_done=0,
+            response_offset=offset,
+        )
+        for offset in range(0, len(resolved_ids), _CHUNK_SIZE)
+    ]
+    db.add_all(jobs)
     db.commit()
-    db.refresh(job)
-    logger.info("BatchJob %s persisted (state=submitted)", job.id)
-    return job
+    for job in jobs:
+        db.refresh(job)
+        logger.info("BatchJob %s persisted (state=submitted)", job.id)
+    return jobs
 
 
 def _apply_batch_results(
@@ -301,6 +396,8 @@ def _apply_batch_results(
     """Apply completed batch results to papers, update BatchJob state. Returns count applied."""
     batch_name = job.gemini_job_name
     state_name = batch.state.name if batch.state is not None else "unknown"
+    # Claim this job's cache keys up front so none outlive the job, whatever the outcome.
+    pending_keys = _take_pending_keys(job.paper_ids)
 
     if batch.state is None or state_name not in JOB_STATES_SUCCEEDED:
         logger.warning("batch %s ended with state %s — marking failed", batch_name, state_name)
@@ -314,10 +411,10 @@ def _apply_batch_results(
 
     responses = (batch.dest.inlined_responses if batch.dest is not None else None) or []
     applied = 0
-    for idx, inline_response in enumerate(responses):
-        if idx >= len(job.paper_ids):
+    for idx, paper_id in enumerate(job.paper_ids):
+        if job.response_offset + idx >= len(responses):
             break
-        paper_id = job.paper_ids[idx]
+        inline_response = responses[job.response_offset + idx]
         paper = papers_by_id.get(paper_id)
         if paper is None:
             continue
@@ -333,6 +430,9 @@ def _apply_batch_results(
             meta = _parse_metadata(str(raw_text))
             _apply_metadata(paper, meta)
             applied += 1
+            key = pending_keys.get(paper_id)
+            if key is not None:
+                _cache_put(key, meta)
         except Exception as exc:
             logger.warning("failed to apply metadata for paper %s: %s", paper_id, exc)
 
@@ -351,10 +451,10 @@ def _is_eligible(paper: Paper) -> bool:
     """Return True if the paper needs metadata extraction and has not been permanently skipped."""
     if paper.metadata_skip_reason is not None:
         return False
-    has_abstract = bool(paper.abstract and paper.abstract.strip())
-    has_authors = bool(paper.authors)
-    has_date = paper.published_date is not None
-    return not (has_abstract and has_authors and has_date)
+    # Cheapest checks first; the abstract strip only runs when everything else is present.
+    if paper.published_date is None or not paper.authors:
+        return True
+    return not (paper.abstract and paper.abstract.strip())
 
 
 def count_eligible_papers(db: Session) -> int:
@@ -363,6 +463,35 @@ def count_eligible_papers(db: Session) -> int:
     return sum(1 for p in papers if _is_eligible(p))
 
 
+def _text_cache_key(text: str) -> str:
+    """Hash *text* with whitespace and case normalised, for metadata cache lookups."""
+    normalised = " ".join(text.lower().split())
+    return hashlib.sha256(normalised.encode()).hexdigest()
+
+
+def _take_pending_keys(paper_ids: list[str]) -> dict[str, str]:
+    """Remove and return the pending cache keys for *paper_ids*."""
+    with _lock:
+        return {
+            pid: key for pid in paper_ids if (key := _pending_text_keys.pop(pid, None)) is not None
+        }
+
+
+def _cache_get(key: str) -> ExtractedMetadata | None:
+    with _lock:
+        cached = _metadata_cache.get(key)
+        if cached is not None:
+            _metadata_cache.move_to_end(key)
+        return cached
+
+
+def _cache_put(key: str, meta: ExtractedMetadata) -> None:
+    with _lock:
+        _metadata_cache[key] = meta
+        if len(_metadata_cache) > _CACHE_MAX_ENTRIES:
+            _metadata_cache.popitem(last=False)
+
+
 def _get_gemini_client() -> tuple[genai.Client, str]:
     api_key = os.environ.get("GEMINI_API_KEY", "").strip()
     model_name = os.environ.get("GEMINI_PDF_MODEL", "").strip()
@@ -373,36 +502,6 @@ def _get_gemini_client() -> tuple[genai.Client, str]:
     return genai.Client(api_key=api_key), model_name
 
 
-def _parse_metadata(raw_text: str) -> ExtractedMetadata:
-    """Parse Gemini response text into ExtractedMetadata."""
-    raw = raw_text.strip()
-    if raw.startswith("```"):
-        raw = raw.split("```", 2)[1]
-        if raw.startswith("json"):
-            raw = raw[4:]
-        raw = raw.rsplit("```", 1)[0].strip()
-
-    try:
-        data: object = json.loads(raw)
-    except json.JSONDecodeError:
-        return ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
-
-    if not isinstance(data, dict):
-        return ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
-
-    title = data.get("title")
-    authors_raw = data.get("authors", [])
-    date = data.get("date")
-    abstract = data.get("abstract")
-
-    return ExtractedMetadata(
-        title=str(title) if title else None,
-        authors=[str(a) for a in authors_raw] if isinstance(authors_raw, list) else [],
-        date=str(date) if date else None,
-        abstract=str(abstract) if abstract else None,
-    )
-
-
 def _apply_metadata(paper: Paper, meta: ExtractedMetadata, *, overwrite_title: bool = False) -> None:
     """Write extracted fields to paper only if the field is currently empty.
 
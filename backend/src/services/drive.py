@@ -1,20 +1,78 @@
 """Google Drive upload service."""
 
 import io
+import json
 import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from googleapiclient.http import MediaIoBaseDownload
+from requests.adapters import HTTPAdapter
 
 from src.services.types import DriveUploadResult
 
+_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
+_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+_MAX_CONCURRENT_UPLOADS = 4
+_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # must be a multiple of 256 KiB
+_MAX_STALLED_CHUNKS = 3  # consecutive resumable PUTs without progress before giving up
+_MAX_BATCH_REQUESTS = 100  # Drive API limit on calls per batch request
+_PUBLIC_READER = {"type": "anyone", "role": "reader"}
+
+
+def _upload_result(file_id: str) -> DriveUploadResult:
+    # Use the /preview URL — it embeds cleanly in iframes unlike /view.
+    embed_url = f"https://drive.google.com/file/d/{file_id}/preview"
+    return DriveUploadResult(file_id=file_id, view_url=embed_url)
+
 
 class DriveUploadError(Exception):
     """Raised when a Drive upload fails."""
 
 
+# Process-wide HTTP session so uploads reuse pooled keep-alive TLS connections
+# across DriveService instances (one is created per ingestion request). It is
+# rebuilt whenever the token file changes, e.g. after the user re-authenticates.
+_session: AuthorizedSession | None = None
+_session_token_mtime: float | None = None
+_session_lock = threading.Lock()
+
+
+def _token_path() -> str:
+    return os.environ.get("GOOGLE_TOKEN_PATH", "token.json")
+
+
+def _load_credentials() -> Credentials:
+    token_path = _token_path()
+    if not os.path.exists(token_path):
+        raise DriveUploadError(
+            f"Google OAuth token not found at {token_path}. "
+            "Complete the OAuth flow first."
+        )
+    creds: Credentials = Credentials.from_authorized_user_file(token_path)  # type: ignore[no-untyped-call]
+    return creds
+
+
+def _get_session() -> AuthorizedSession:
+    global _session, _session_token_mtime
+    try:
+        mtime: float | None = os.path.getmtime(_token_path())
+    except OSError:
+        mtime = None
+    with _session_lock:
+        if _session is None or mtime != _session_token_mtime:
+            session = AuthorizedSession(_load_credentials())  # type: ignore[no-untyped-call]
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            _session = session
+            _session_token_mtime = mtime
+        return _session
+
+
 class DriveService:
     """Uploads PDFs to Google Drive using the authenticated user's account."""
 
@@ -23,14 +81,7 @@ class DriveService:
 
     def _get_service(self) -> Any:
         if self._service is None:
-            token_path = os.environ.get("GOOGLE_TOKEN_PATH", "token.json")
-            if not os.path.exists(token_path):
-                raise DriveUploadError(
-                    f"Google OAuth token not found at {token_path}. "
-                    "Complete the OAuth flow first."
-                )
-            creds = Credentials.from_authorized_user_file(token_path)  # type: ignore[no-untyped-call]
-            self._service = build("drive", "v3", credentials=creds)
+            self._service = build("drive", "v3", credentials=_load_credentials())
         return self._service
 
     def upload(self, pdf_bytes: bytes, filename: str) -> DriveUploadResult:
@@ -40,43 +91,153 @@ class DriveService:
         Raises DriveUploadError on failure.
         """
         try:
-            service = self._get_service()
-            media = MediaIoBaseUpload(
-                io.BytesIO(pdf_bytes),
-                mimetype="application/pdf",
-                resumable=False,
-            )
-            folder_id = os.environ.get("DRIVE_FOLDER_ID", "").strip()
-            file_metadata: dict[str, object] = {
-                "name": filename,
-                "mimeType": "application/pdf",
-            }
-            if folder_id:
-                file_metadata["parents"] = [folder_id]
-            created = (
-                service.files()
-                .create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields="id,webViewLink",
-                    supportsAllDrives=True,
-                )
-                .execute()
-            )
-            file_id: str = created["id"]
-
+            file_id = self._create_file(pdf_bytes, filename)
             # Make the file readable by anyone with the link.
-            service.permissions().create(
-                fileId=file_id,
-                body={"type": "anyone", "role": "reader"},
-            ).execute()
-
-            # Use the /preview URL — it embeds cleanly in iframes unlike /view.
-            embed_url = f"https://drive.google.com/file/d/{file_id}/preview"
-            return DriveUploadResult(file_id=file_id, view_url=embed_url)
+            response = _get_session().post(
+                f"{_FILES_URL}/{file_id}/permissions",
+                params={"supportsAllDrives": "true"},
+                json=_PUBLIC_READER,
+            )
+            response.raise_for_status()
+            return _upload_result(file_id)
         except Exception as exc:
             raise DriveUploadError(str(exc)) from exc
 
+    def upload_many(
+        self, items: list[tuple[bytes, str]]
+    ) -> list[DriveUploadResult | DriveUploadError]:
+        """Upload several (pdf_bytes, filename) pairs concurrently.
+
+        Files are created in parallel, then shared in batched permission requests.
+        Returns one DriveUploadResult or DriveUploadError per item, in input order.
+        """
+
+        def _create_one(item: tuple[bytes, str]) -> str | DriveUploadError:
+            try:
+                return self._create_file(*item)
+            except Exception as exc:
+                return DriveUploadError(str(exc))
+
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_UPLOADS) as pool:
+            created = list(pool.map(_create_one, items))
+
+        file_ids = [c for c in created if isinstance(c, str)]
+        try:
+            share_errors = self._share_publicly(file_ids)
+        except Exception as exc:
+            share_errors = {fid: exc for fid in file_ids}
+        # The caller only sees an error for these, so remove the created files here.
+        for fid in share_errors:
+            self.delete(fid)
+
+        results: list[DriveUploadResult | DriveUploadError] = []
+        for c in created:
+            if isinstance(c, DriveUploadError):
+                results.append(c)
+            elif c in share_errors:
+                results.append(DriveUploadError(str(share_errors[c])))
+            else:
+                results.append(_upload_result(c))
+        return results
+
+    def _create_file(self, pdf_bytes: bytes, filename: str) -> str:
+        """Create *filename* in the configured Drive folder and return its file ID.
+
+        Small files go up in one multipart/related request; files larger than
+        _UPLOAD_CHUNK_SIZE use a chunked resumable upload.
+        """
+        folder_id = os.environ.get("DRIVE_FOLDER_ID", "").strip()
+        file_metadata: dict[str, object] = {
+            "name": filename,
+            "mimeType": "application/pdf",
+        }
+        if folder_id:
+            file_metadata["parents"] = [folder_id]
+        if len(pdf_bytes) > _UPLOAD_CHUNK_SIZE:
+            return self._create_file_resumable(pdf_bytes, file_metadata)
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            [
+                f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n".encode(),
+                json.dumps(file_metadata).encode(),
+                f"\r\n--{boundary}\r\nContent-Type: application/pdf\r\n\r\n".encode(),
+                pdf_bytes,
+                f"\r\n--{boundary}--".encode(),
+            ]
+        )
+        response = _get_session().post(
+            _UPLOAD_URL,
+            params={"uploadType": "multipart", "fields": "id", "supportsAllDrives": "true"},
+            data=body,
+            headers={"Content-Type": f"multipart/related; boundary={boundary}"},
+        )
+        response.raise_for_status()
+        file_id: str = response.json()["id"]
+        return file_id
+
+    def _create_file_resumable(self, pdf_bytes: bytes, file_metadata: dict[str, object]) -> str:
+        """Upload *pdf_bytes* in _UPLOAD_CHUNK_SIZE pieces through a resumable session."""
+        session = _get_session()
+        total = len(pdf_bytes)
+        started = session.post(
+            _UPLOAD_URL,
+            params={"uploadType": "resumable", "fields": "id", "supportsAllDrives": "true"},
+            data=json.dumps(file_metadata),
+            headers={
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Type": "application/pdf",
+                "X-Upload-Content-Length": str(total),
+            },
+        )
+        started.raise_for_status()
+        upload_url = started.headers["Location"]
+        offset = 0
+        stalled = 0
+        while True:
+            end = min(offset + _UPLOAD_CHUNK_SIZE, total)
+            response = session.put(
+                upload_url,
+                data=pdf_bytes[offset:end],
+                headers={"Content-Range": f"bytes {offset}-{end - 1}/{total}"},
+            )
+            if response.status_code == 308:
+                # Incomplete — resume after the last byte Drive reports as stored.
+                stored = response.headers.get("Range")  # e.g. "bytes=0-4194303"
+                new_offset = int(stored.rsplit("-", 1)[1]) + 1 if stored else 0
+                stalled = stalled + 1 if new_offset <= offset else 0
+                if stalled >= _MAX_STALLED_CHUNKS:
+                    raise DriveUploadError(
+                        f"Resumable upload made no progress after {stalled} attempts "
+                        f"(stuck at byte {new_offset} of {total})"
+                    )
+                offset = new_offset
+                continue
+            response.raise_for_status()
+            file_id: str = response.json()["id"]
+            return file_id
+
+    def _share_publicly(self, file_ids: list[str]) -> dict[str, Exception]:
+        """Grant anyone-with-link read access to *file_ids* using batch HTTP requests.
+
+        Returns a mapping of file ID to the error for any grants that failed.
+        """
+        service = self._get_service()
+        errors: dict[str, Exception] = {}
+
+        def _on_response(request_id: str, _response: object, exception: Exception | None) -> None:
+            if exception is not None:
+                errors[request_id] = exception
+
+        for i in range(0, len(file_ids), _MAX_BATCH_REQUESTS):
+            batch = service.new_batch_http_request(callback=_on_response)
+            for file_id in file_ids[i : i + _MAX_BATCH_REQUESTS]:
+                batch.add(
+                    service.permissions().create(fileId=file_id, body=_PUBLIC_READER),
+                    request_id=file_id,
+                )
+            batch.execute()
+        return errors
+
     def download(self, file_id: str) -> bytes:
         """Download *file_id* from Drive and return its raw bytes.
 
@@ -94,6 +255,18 @@ class DriveService:
         except Exception as exc:
             raise DriveUploadError(str(exc)) from exc
 
+    def rename(self, file_id: str, filename: str) -> None:
+        """Rename *file_id* to *filename*. Silently ignores errors (best-effort)."""
+        try:
+            response = _get_session().patch(
+                f"{_FILES_URL}/{file_id}",
+                params={"supportsAllDrives": "true"},
+                json={"name": filename},
+            )
+            response.raise_for_status()
+        except Exception:
+            pass
+
     def delete(self, file_id: str) -> None:
         """Delete *file_id* from Drive. Silently ignores errors (best-effort)."""
         try:
@@ -1,18 +1,34 @@
 """Gemini LLM service for extracting paper metadata from PDF bytes."""
 
+import hashlib
 import io
 import json
 import logging
 import os
+import re
+import threading
+from collections import OrderedDict
+from itertools import pairwise
 
 import pdfplumber
 from google import genai
+from google.genai import types as genai_types
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from src.schemas.paper import ExtractedMetadata
 
 logger = logging.getLogger(__name__)
 
 _MAX_PAGES = 2
+# Matches a reply wrapped in a ```/```json fence, up to the first closing fence (which
+# may be missing); any prose after that fence is ignored.
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+_CACHE_MAX_ENTRIES = 256
+
+# In-process LRU of extraction results keyed by PDF content hash, so re-ingesting
+# identical bytes does not repeat the Gemini call.
+_metadata_cache: OrderedDict[str, ExtractedMetadata] = OrderedDict()
+_cache_lock = threading.Lock()
 
 
 def _page_text(page: pdfplumber.page.Page) -> str:  # type: ignore[name-defined]
@@ -20,18 +36,12 @@ def _page_text(page: pdfplumber.page.Page) -> str:  # type: ignore[name-defined]
     words = page.extract_words(x_tolerance=3, y_tolerance=3, keep_blank_chars=False)
     if not words:
         return ""
-    lines: list[str] = []
-    current_line: list[str] = []
-    prev_bottom: float = words[0]["bottom"]
-    for word in words:
-        if abs(word["bottom"] - prev_bottom) > 5:
-            lines.append(" ".join(current_line))
-            current_line = []
-        current_line.append(word["text"])
-        prev_bottom = word["bottom"]
-    if current_line:
-        lines.append(" ".join(current_line))
-    return "\n".join(lines)
+    texts = [w["text"] for w in words]
+    bottoms = [w["bottom"] for w in words]
+    # A new line starts wherever the baseline jumps by more than 5pt from the previous word.
+    breaks = [i for i, (prev, cur) in enumerate(pairwise(bottoms), 1) if abs(cur - prev) > 5]
+    bounds = [0, *breaks, len(words)]
+    return "\n".join(" ".join(texts[start:end]) for start, end in pairwise(bounds))
 
 
 def _extract_first_pages_text(pdf_bytes: bytes, max_pages: int) -> tuple[str, int]:
@@ -42,9 +52,47 @@ def _extract_first_pages_text(pdf_bytes: bytes, max_pages: int) -> tuple[str, in
         return text, len(pages)
 
 
-_PROMPT = (
-    "You are a research paper metadata extractor. "
-    "The following is text extracted from the first pages of a research paper PDF. "
+class _JsonObjectScanner:
+    """Track brace depth over streamed text to detect the end of the first JSON object."""
+
+    def __init__(self) -> None:
+        self._buf = io.StringIO()
+        self._start = -1
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> str | None:
+        """Append *text*; return the first complete top-level object once it has closed."""
+        self._buf.write(text)
+        for ch in text:
+            pos = self._pos
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._start >= 0:
+                self._in_string = True
+            elif ch == "{":
+                if self._start < 0:
+                    self._start = pos
+                self._depth += 1
+            elif ch == "}" and self._start >= 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self._buf.getvalue()[self._start : pos + 1]
+        return None
+
+    def text(self) -> str:
+        return self._buf.getvalue()
+
+
+_PROMPT_KEYS = (
     "Return ONLY a valid JSON object with these keys:\n"
     '  "title": string or null,\n'
     '  "authors": array of strings (full names),\n'
@@ -53,13 +101,28 @@ _PROMPT = (
     "Return nothing except the JSON object — no markdown, no explanation."
 )
 
+_PROMPT = (
+    "You are a research paper metadata extractor. "
+    "The following is text extracted from the first pages of a research paper PDF. "
+    + _PROMPT_KEYS
+)
+
+# Used when the raw PDF is attached and Gemini does the layout parsing itself.
+_PDF_PROMPT = (
+    "You are a research paper metadata extractor. "
+    "The attached file is a research paper PDF; read its first pages. "
+    + _PROMPT_KEYS
+)
+
 
 class GeminiService:
     """Calls the Gemini API to extract metadata from a PDF."""
 
-    def extract_metadata(self, pdf_bytes: bytes) -> ExtractedMetadata:
+    def extract_metadata(self, pdf_bytes: bytes, use_cache: bool = True) -> ExtractedMetadata:
         """Send *pdf_bytes* to Gemini and return structured metadata.
 
+        With *use_cache* False the cache is bypassed (but still refreshed), so an
+        explicit retry always reaches Gemini.
         Raises ValueError if required env vars are missing.
         Returns an all-None ExtractedMetadata on LLM parse failure.
         """
@@ -70,40 +133,116 @@ class GeminiService:
         if not model_name:
             raise ValueError("GEMINI_PDF_MODEL environment variable is not set")
 
-        text, pages_sent = _extract_first_pages_text(pdf_bytes, _MAX_PAGES)
-        logger.info("sending %d page(s) (%d chars) to Gemini model %s", pages_sent, len(text), model_name)
+        key = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+        cached = None
+        if use_cache:
+            with _cache_lock:
+                cached = _metadata_cache.get(key)
+                if cached is not None:
+                    _metadata_cache.move_to_end(key)
+        if cached is not None:
+            logger.info("Gemini metadata cache hit (%s)", key)
+            return cached.model_copy(deep=True)
+
+        meta = self._call_gemini(pdf_bytes, api_key, model_name)
+        # Only cache useful results so a failed parse is retried next time.
+        if meta.title or meta.authors or meta.date or meta.abstract:
+            with _cache_lock:
+                _metadata_cache[key] = meta.model_copy(deep=True)
+                if len(_metadata_cache) > _CACHE_MAX_ENTRIES:
+                    _metadata_cache.popitem(last=False)
+        return meta
+
+    def _call_gemini(self, pdf_bytes: bytes, api_key: str, model_name: str) -> ExtractedMetadata:
+        """Upload the raw PDF to Gemini, query it, and parse its JSON reply."""
+        logger.info("sending PDF (%d bytes) to Gemini model %s", len(pdf_bytes), model_name)
 
         client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model=model_name,
-            contents=[_PROMPT, text],
+        uploaded = client.files.upload(
+            file=io.BytesIO(pdf_bytes),
+            config={"mime_type": "application/pdf"},
         )
-
-        logger.info("Gemini response received (%d chars)", len(response.text))
-        raw = response.text.strip()
-        # Strip optional markdown code fence
-        if raw.startswith("```"):
-            raw = raw.split("```", 2)[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-            raw = raw.rsplit("```", 1)[0].strip()
-
         try:
-            data: object = json.loads(raw)
-        except json.JSONDecodeError:
-            return ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
-
-        if not isinstance(data, dict):
-            return ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
-
-        title = data.get("title")
-        authors_raw = data.get("authors", [])
-        date = data.get("date")
-        abstract = data.get("abstract")
-
+            # Stream the response and stop reading as soon as the JSON object is complete.
+            scanner = _JsonObjectScanner()
+            json_object: str | None = None
+            contents: list[genai_types.PartUnionDict] = [uploaded, _PDF_PROMPT]
+            for chunk in client.models.generate_content_stream(
+                model=model_name,
+                contents=contents,
+            ):
+                json_object = scanner.feed(chunk.text or "")
+                if json_object is not None:
+                    break
+        finally:
+            try:
+                if uploaded.name:
+                    client.files.delete(name=uploaded.name)
+            except Exception:
+                logger.warning("failed to delete uploaded Gemini file %s", uploaded.name)
+
+        logger.info("Gemini response received (%d chars)", len(scanner.text()))
+        raw = json_object if json_object is not None else scanner.text().strip()
+        return _parse_metadata(raw)
+
+
+class _MetadataResponse(BaseModel):
+    """Shape of the JSON object Gemini is prompted to return."""
+
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    title: str | None = None
+    authors: list[str] = Field(default_factory=list)
+    date: str | None = None
+    abstract: str | None = None
+
+
+def _parse_metadata(raw_text: str) -> ExtractedMetadata:
+    """Parse Gemini response text into ExtractedMetadata."""
+    raw = raw_text.strip()
+    # Strip optional markdown code fence
+    fenced = _FENCE_RE.match(raw)
+    if fenced:
+        raw = fenced.group(1)
+
+    # Fast path: parse and validate in pydantic-core in a single pass.
+    try:
+        parsed = _MetadataResponse.model_validate_json(raw)
+    except ValidationError:
+        pass
+    else:
         return ExtractedMetadata(
-            title=str(title) if title else None,
-            authors=[str(a) for a in authors_raw] if isinstance(authors_raw, list) else [],
-            date=str(date) if date else None,
-            abstract=str(abstract) if abstract else None,
+            title=parsed.title or None,
+            authors=parsed.authors,
+            date=parsed.date or None,
+            abstract=parsed.abstract or None,
         )
+
+    # Lenient fallback for off-schema replies (e.g. non-string author entries).
+    try:
+        data: object = json.loads(raw)
+    except json.JSONDecodeError:
+        return ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
+
+    if not isinstance(data, dict):
+        return ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
+
+    title = data.get("title")
+    authors_raw = data.get("authors", [])
+    date = data.get("date")
+    abstract = data.get("abstract")
+
+    authors: list[str] = []
+    if isinstance(authors_raw, list):
+        # Reuse the list as-is when every entry is already a string.
+        if all(type(a) is str for a in authors_raw):
+            authors = authors_raw
+        else:
+            authors = [str(a) for a in authors_raw]
+
+    return ExtractedMetadata(
+        title=str(title) if title else None,
+        authors=authors,
+        date=str(date) if date else None,
+        abstract=str(abstract) if abstract else None,
+    )
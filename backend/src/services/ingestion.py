@@ -1,18 +1,43 @@
 """Paper ingestion service — orchestrates fetch, upload, and persistence."""
 
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
 from pathlib import Path
 from urllib.parse import urlparse
 
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from src.models.note import Note
 from src.models.paper import Paper
 from src.services.arxiv_client import ArxivClient, extract_arxiv_id
-from src.services.drive import DriveService
-from src.services.pdf_parser import PdfParser
+from src.services.drive import DriveService, DriveUploadError
+from src.services.pdf_parser import PdfContext, PdfParser
+from src.services.types import DriveUploadResult
 
 _ARXIV_HOSTNAMES = {"arxiv.org", "ar5iv.labs.arxiv.org"}
 
+_MAX_CONCURRENT_INGESTS = 4
+
+
+class _SafeCharTable(dict[int, str]):
+    """str.translate table mapping unsafe filename characters to "_", filled lazily."""
+
+    def __missing__(self, codepoint: int) -> str:
+        ch = chr(codepoint)
+        safe = ch if ch.isalnum() or ch in " -_" else "_"
+        self[codepoint] = safe
+        return safe
+
+
+_SAFE_CHARS = _SafeCharTable()
+
+
+def _safe_title(title: str) -> str:
+    """Replace characters that are unsafe in Drive filenames with underscores."""
+    return title.translate(_SAFE_CHARS).strip()
+
 
 class DuplicateError(Exception):
     """Raised when the submitted paper already exists in the library."""
@@ -32,6 +57,35 @@ class IngestionService:
         self._pdf = PdfParser()
         self._drive = DriveService()
 
+    def _upload_and_extract_text(
+        self, pdf: PdfContext, filename: str
+    ) -> tuple[DriveUploadResult, str | None]:
+        """Upload the PDF to Drive while extracting full text on this thread.
+
+        Raises DriveUploadError if the upload fails.
+        """
+        drive_future = self._start_upload(pdf.pdf_bytes, filename)
+        extracted_text = self._pdf.extract_full_text(pdf)
+        return drive_future.result(), extracted_text
+
+    def _start_upload(self, pdf_bytes: bytes, filename: str) -> Future[DriveUploadResult]:
+        """Start the Drive upload on a dedicated thread and return its future.
+
+        A per-call thread (not a shared pool) means concurrent ingests never queue
+        behind each other's uploads.
+        """
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            return pool.submit(self._drive.upload, pdf_bytes, filename=filename)
+        finally:
+            # The worker thread exits once the upload finishes.
+            pool.shutdown(wait=False)
+
+    def _discard_upload(self, drive_future: Future[DriveUploadResult]) -> None:
+        """Delete the file from an in-flight upload that is no longer needed."""
+        with suppress(DriveUploadError):
+            self._drive.delete(drive_future.result()["file_id"])
+
     def ingest(self, url: str, db: Session) -> Paper:
         """Ingest a paper from *url* into the library.
 
@@ -39,30 +93,36 @@ class IngestionService:
         Raises DuplicateError if the paper already exists.
         Raises DriveUploadError if the Drive upload fails (no partial record created).
         """
-        # Duplicate check by submission URL.
-        if db.query(Paper).filter(Paper.submission_url == url).first():
+        arxiv_id = extract_arxiv_id(url) if _is_arxiv_url(url) else None
+
+        # Duplicate check by submission URL, and by arXiv ID (covers different URL
+        # forms of the same paper), in a single query.
+        duplicate = Paper.submission_url == url
+        if arxiv_id is not None:
+            duplicate = or_(duplicate, Paper.arxiv_id == arxiv_id)
+        if db.query(Paper.id).filter(duplicate).first():
             raise DuplicateError("Paper already exists in your library")
 
-        if _is_arxiv_url(url):
-            arxiv_id = extract_arxiv_id(url)
-            # Duplicate check by arXiv ID (covers different URL forms of the same paper).
-            if db.query(Paper).filter(Paper.arxiv_id == arxiv_id).first():
-                raise DuplicateError("Paper already exists in your library")
+        # One PdfContext per paper, so metadata and full text share a single parse.
+        if arxiv_id is not None:
             metadata = self._arxiv.fetch(url)
-            pdf_url = f"https://arxiv.org/pdf/{arxiv_id}"
-            _, pdf_bytes = self._pdf.download_and_extract(pdf_url)
+            pdf = self._pdf.open(self._pdf.download(f"https://arxiv.org/pdf/{arxiv_id}"))
         else:
-            metadata, pdf_bytes = self._pdf.download_and_extract(url)
-
-        # Upload to Drive — raises DriveUploadError on failure.
-        title = metadata.get("title") or "Untitled"
-        if db.query(Paper).filter(Paper.title == title).first():
-            raise DuplicateError("A paper with this title already exists in your library")
-        safe_title = "".join(c if c.isalnum() or c in " -_" else "_" for c in title).strip()
-        drive_result = self._drive.upload(
-            pdf_bytes,
-            filename=f"{safe_title}.pdf",
-        )
+            pdf = self._pdf.open(self._pdf.download(url))
+            metadata = self._pdf.extract_metadata(pdf)
+
+        with pdf:
+            # Upload to Drive — raises DriveUploadError on failure.
+            title = metadata.get("title") or "Untitled"
+            if db.query(Paper).filter(Paper.title == title).first():
+                raise DuplicateError("A paper with this title already exists in your library")
+            # arXiv IDs are already filename-safe apart from the slash in legacy IDs.
+            filename = (
+                f"{arxiv_id.replace('/', '_')}.pdf"
+                if arxiv_id is not None
+                else f"{_safe_title(title)}.pdf"
+            )
+            drive_result, extracted_text = self._upload_and_extract_text(pdf, filename)
         paper = Paper(
             title=title,
             authors=metadata.get("authors") or [],
@@ -72,7 +132,7 @@ class IngestionService:
             submission_url=url,
             drive_file_id=drive_result["file_id"],
             drive_view_url=drive_result["view_url"],
-            extracted_text=self._pdf.extract_full_text(pdf_bytes),
+            extracted_text=extracted_text,
         )
         db.add(paper)
         db.flush()
@@ -83,6 +143,28 @@ class IngestionService:
         db.refresh(paper)
         return paper
 
+    def ingest_many(
+        self, urls: list[str], session_factory: Callable[[], Session]
+    ) -> list[Paper | Exception]:
+        """Ingest several URLs concurrently, at most _MAX_CONCURRENT_INGESTS at a time.
+
+        Each worker uses its own session from *session_factory* (sessions are not
+        thread-safe). Returns the created Paper or the raised exception per URL,
+        in input order.
+        """
+
+        def _ingest_one(url: str) -> Paper | Exception:
+            db = session_factory()
+            try:
+                return self.ingest(url, db)
+            except Exception as exc:
+                return exc
+            finally:
+                db.close()
+
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_INGESTS) as pool:
+            return list(pool.map(_ingest_one, urls))
+
     def ingest_local(
         self,
         pdf_bytes: bytes,
@@ -101,13 +183,27 @@ class IngestionService:
         if db.query(Paper).filter(Paper.submission_url == submission_url).first():
             raise DuplicateError("Paper already exists in your library")
 
-        metadata = self._pdf.extract_metadata(pdf_bytes)
-        title = metadata.get("title") or "Untitled"
-        if db.query(Paper).filter(Paper.title == title).first():
-            raise DuplicateError("A paper with this title already exists in your library")
-
-        safe_title = "".join(c if c.isalnum() or c in " -_" else "_" for c in title).strip()
-        drive_result = self._drive.upload(pdf_bytes, filename=f"{safe_title}.pdf")
+        # Start the Drive upload under the local file name while the PDF is parsed;
+        # the file is renamed to its title once that is known.
+        upload_name = f"{_safe_title(local_path.stem)}.pdf"
+        drive_future = self._start_upload(pdf_bytes, upload_name)
+        try:
+            with self._pdf.open(pdf_bytes) as pdf:
+                metadata = self._pdf.extract_metadata(pdf)
+                title = metadata.get("title") or "Untitled"
+                if db.query(Paper).filter(Paper.title == title).first():
+                    raise DuplicateError("A paper with this title already exists in your library")
+
+                extracted_text = self._pdf.extract_full_text(pdf)
+            drive_result = drive_future.result()
+        except BaseException:
+            # The upload is already under way (and publicly shared), so any failure
+            # before it is recorded must not leave the file behind in Drive.
+            self._discard_upload(drive_future)
+            raise
+        filename = f"{_safe_title(title)}.pdf"
+        if filename != upload_name:
+            self._drive.rename(drive_result["file_id"], filename)
 
         paper = Paper(
             title=title,
@@ -118,7 +214,7 @@ class IngestionService:
             submission_url=submission_url,
             drive_file_id=drive_result["file_id"],
             drive_view_url=drive_result["view_url"],
-            extracted_text=self._pdf.extract_full_text(pdf_bytes),
+            extracted_text=extracted_text,
         )
         db.add(paper)
         db.flush()
@@ -1,18 +1,71 @@
 """PDF downloader and metadata extractor."""
 
 import io
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import TracebackType
+from typing import Self
 
 import httpx
 import pdfplumber
+from pdfplumber.pdf import PDF
 
 from src.services.types import PaperMetadata
 
 _PDF_MAGIC = b"%PDF"
+_TITLE_BAND = 0.35  # fraction of the first page searched for a fallback title
+
+# Shared keep-alive client so repeated downloads (e.g. from arxiv.org) reuse
+# pooled TLS connections instead of opening a fresh one per ingestion.
+_HTTP_CLIENT = httpx.Client(
+    follow_redirects=True,
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+)
+
+
+class PdfContext:
+    """PDF bytes plus a pdfplumber document parsed on first use and then shared.
+
+    Passing one context to several extract_* calls parses the PDF structure once
+    instead of once per call.
+    """
+
+    def __init__(self, pdf_bytes: bytes) -> None:
+        self.pdf_bytes = pdf_bytes
+        self._document: PDF | None = None
+
+    @property
+    def document(self) -> PDF:
+        """The parsed document. Raises whatever pdfplumber raises on unreadable PDFs."""
+        if self._document is None:
+            self._document = pdfplumber.open(io.BytesIO(self.pdf_bytes))
+        return self._document
+
+    def close(self) -> None:
+        if self._document is not None:
+            self._document.close()
+            self._document = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
 
 
 class PdfParser:
     """Download a PDF from a URL and extract best-effort metadata."""
 
+    def open(self, pdf_bytes: bytes) -> PdfContext:
+        """Wrap *pdf_bytes* in a context that extract_* calls can share."""
+        return PdfContext(pdf_bytes)
+
     def download_and_extract(self, url: str) -> tuple[PaperMetadata, bytes]:
         """Download the PDF at *url* and return (metadata, pdf_bytes).
 
@@ -20,25 +73,47 @@ class PdfParser:
             httpx.HTTPStatusError: if the HTTP request fails.
             ValueError: if the response is not a PDF.
         """
-        response = httpx.get(url, follow_redirects=True, timeout=30)
-        response.raise_for_status()
+        pdf_bytes = self.download(url)
+        return self.extract_metadata(pdf_bytes), pdf_bytes
 
-        content_type = response.headers.get("content-type", "")
-        if "pdf" not in content_type and not response.content.startswith(_PDF_MAGIC):
-            raise ValueError(f"URL is not a PDF (content-type: {content_type!r})")
+    def download(self, url: str) -> bytes:
+        """Download the PDF at *url* and return its bytes.
 
-        pdf_bytes = response.content
-        metadata = self.extract_metadata(pdf_bytes)
-        return metadata, pdf_bytes
+        Raises:
+            httpx.HTTPStatusError: if the HTTP request fails.
+            ValueError: if the response is not a PDF.
+        """
+        with _HTTP_CLIENT.stream("GET", url) as response:
+            response.raise_for_status()
 
-    def extract_metadata(self, pdf_bytes: bytes) -> PaperMetadata:
+            # Check the magic bytes from the first chunk before reading the whole body.
+            content_type = response.headers.get("content-type", "")
+            chunks = response.iter_bytes()
+            head = b""
+            for chunk in chunks:
+                head += chunk
+                if len(head) >= len(_PDF_MAGIC):
+                    break
+            if "pdf" not in content_type and not head.startswith(_PDF_MAGIC):
+                raise ValueError(f"URL is not a PDF (content-type: {content_type!r})")
+
+            return b"".join([head, *chunks])
+
+    def extract_metadata(self, pdf: bytes | PdfContext) -> PaperMetadata:
         raw: dict[str, object] = {}
         first_page_text: str = ""
         try:
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                raw = pdf.metadata or {}
-                if pdf.pages:
-                    first_page_text = pdf.pages[0].extract_text() or ""
+            with _shared(pdf) as ctx:
+                doc = ctx.document
+                raw = doc.metadata or {}
+                # Only extract page text when the document info has no title, and then
+                # only from the top band of the first page, where titles sit.
+                if not raw.get("Title") and doc.pages:
+                    page = doc.pages[0]
+                    # page.bbox keeps the MediaBox origin, which need not be (0, 0).
+                    x0, top, x1, _ = page.bbox
+                    header = page.crop((x0, top, x1, top + page.height * _TITLE_BAND))
+                    first_page_text = header.extract_text() or page.extract_text() or ""
         except Exception:
             pass
 
@@ -62,12 +137,22 @@ class PdfParser:
             arxiv_id=None,
         )
 
-    def extract_full_text(self, pdf_bytes: bytes) -> str | None:
+    def extract_full_text(self, pdf: bytes | PdfContext) -> str | None:
         """Extract all text from a PDF using pdfplumber. Returns None on failure."""
         try:
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            with _shared(pdf) as ctx:
                 return "\n\n".join(
-                    page.extract_text() or "" for page in pdf.pages
+                    page.extract_text() or "" for page in ctx.document.pages
                 ).strip() or None
         except Exception:
             return None
+
+
+@contextmanager
+def _shared(pdf: bytes | PdfContext) -> Iterator[PdfContext]:
+    """Yield *pdf* as a context, closing it afterwards only if it was created here."""
+    if isinstance(pdf, PdfContext):
+        yield pdf
+        return
+    with PdfContext(pdf) as ctx:
+        yield ctx
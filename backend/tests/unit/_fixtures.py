@@ -0,0 +1,28 @@
+"""Types and helpers shared by the unit tests and their conftest fixtures."""
+
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.services.ingestion import IngestionService
+from src.services.types import PaperMetadata
+
+ServiceFactory = Callable[[MagicMock, MagicMock, MagicMock], IngestionService]
+PaperMetadataFactory = Callable[..., PaperMetadata]
+DbFactory = Callable[..., MagicMock]
+
+PDF_BYTES = b"%PDF-1.4 fake"
+FAKE_PATH = Path("/tmp/paper.pdf")
+
+
+class FirstSeq:
+    """Callable returning the given values in order, one per call."""
+
+    def __init__(self, values: list[object]) -> None:
+        self.values = values
+        self.i = 0
+
+    def __call__(self) -> object:
+        value = self.values[self.i]
+        self.i += 1
+        return value
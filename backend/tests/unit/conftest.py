@@ -0,0 +1,122 @@
+"""Fixtures shared by the unit tests."""
+
+import importlib
+from collections.abc import Iterator
+from unittest.mock import DEFAULT, MagicMock, create_autospec, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.services.ingestion import IngestionService
+from src.services.types import DriveUploadResult, PaperMetadata
+from tests.unit._fixtures import DbFactory, FirstSeq, PaperMetadataFactory, ServiceFactory
+
+# Autospeccing Session is slow, so build one at import and reset it per test.
+_DB_SPEC: MagicMock = create_autospec(Session, instance=True)
+
+_DRIVE_RESULT: DriveUploadResult = {
+    "file_id": "drive-file-123",
+    "view_url": "https://drive.google.com/file/d/drive-file-123/view",
+}
+
+
+_SERVICE_MODULES = (
+    "src.services.arxiv_client",
+    "src.services.drive",
+    "src.services.ingestion",
+    "src.services.notes",
+    "src.services.pdf_parser",
+    "src.services.search",
+)
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Keep each module's tests contiguous, preserving their order within the module.
+
+    Module-scoped fixtures are then set up once, and xdist's --dist=loadscope keeps
+    a module on one worker.
+    """
+    items.sort(key=lambda item: str(item.path))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_imports() -> None:
+    """Import every service module once per test process (per xdist worker)."""
+    for name in _SERVICE_MODULES:
+        importlib.import_module(name)
+
+
+@pytest.fixture()
+def paper_metadata_factory() -> PaperMetadataFactory:
+    """Return a builder for PaperMetadata with test defaults."""
+
+    def make(
+        title: str | None = "Test Paper",
+        authors: list[str] | None = None,
+        abstract: str | None = "Some abstract.",
+        arxiv_id: str | None = None,
+    ) -> PaperMetadata:
+        return PaperMetadata(
+            title=title,
+            authors=authors if authors is not None else ["Alice"],
+            published_date=None,
+            abstract=abstract,
+            arxiv_id=arxiv_id,
+        )
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def drive_result() -> DriveUploadResult:
+    """A successful Drive upload result; treat as read-only."""
+    return _DRIVE_RESULT
+
+
+@pytest.fixture()
+def db() -> MagicMock:
+    """Autospecced mock db session, reset for each test."""
+    _DB_SPEC.reset_mock(return_value=True, side_effect=True)
+    return _DB_SPEC
+
+
+@pytest.fixture()
+def db_factory() -> DbFactory:
+    """Return a builder for mock db sessions.
+
+    *first_results* controls successive return values of .query().filter().first().
+    Defaults to all-None (no duplicates found).
+    """
+
+    def make(first_results: list[object] | None = None) -> MagicMock:
+        db = MagicMock(spec=Session)
+        if first_results is None:
+            db.query.return_value.filter.return_value.first.return_value = None
+        else:
+            db.query.return_value.filter.return_value.first = FirstSeq(first_results)
+        return db
+
+    return make
+
+
+@pytest.fixture(scope="module")
+def service_factory() -> Iterator[ServiceFactory]:
+    """Patch IngestionService's collaborators once per module.
+
+    Yields make(arxiv, pdf, drive), which points the patched classes at the given
+    mocks and returns a fresh IngestionService.
+    """
+    with patch.multiple(
+        "src.services.ingestion",
+        ArxivClient=DEFAULT,
+        PdfParser=DEFAULT,
+        DriveService=DEFAULT,
+    ) as classes:
+
+        def make(arxiv: MagicMock, pdf: MagicMock, drive: MagicMock) -> IngestionService:
+            classes["ArxivClient"].return_value = arxiv
+            classes["PdfParser"].return_value = pdf
+            classes["DriveService"].return_value = drive
+            return IngestionService()
+
+        yield make
@@ -1,10 +1,12 @@
 """Unit tests for ArxivClient."""
 
+from collections.abc import Iterator
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.services.arxiv_client import ArxivClient
+from src.services.arxiv_client import ArxivClient, extract_arxiv_id
 
 
 def _make_arxiv_result(
@@ -14,32 +16,32 @@ def _make_arxiv_result(
     published: str = "2023-01-01",
     summary: str = "Abstract text.",
     entry_id: str = "http://arxiv.org/abs/2301.00001v1",
-) -> MagicMock:
-    result = MagicMock()
-    result.title = title
-    author_mocks = []
-    for a in authors or ["Alice", "Bob"]:
-        m = MagicMock()
-        m.name = a
-        author_mocks.append(m)
-    result.authors = author_mocks
-    result.published = MagicMock()
-    result.published.date.return_value = published
-    result.summary = summary
-    result.entry_id = entry_id
-    return result
+) -> SimpleNamespace:
+    """Stand-in for arxiv.Result with only the attributes ArxivClient reads."""
+    return SimpleNamespace(
+        title=title,
+        authors=[SimpleNamespace(name=a) for a in authors or ["Alice", "Bob"]],
+        published=SimpleNamespace(date=lambda: published),
+        summary=summary,
+        entry_id=entry_id,
+    )
 
 
 class TestArxivClientFetch:
+    mock_client_cls: MagicMock
+
+    @pytest.fixture(autouse=True)
+    def _patched_client(self) -> Iterator[None]:
+        with patch("src.services.arxiv_client.arxiv.Client") as mock_client_cls:
+            self.mock_client_cls = mock_client_cls
+            yield
+
     def test_returns_paper_metadata_with_correct_fields(self) -> None:
         mock_result = _make_arxiv_result()
-        with patch("src.services.arxiv_client.arxiv.Client") as mock_client_cls:
-            mock_client = MagicMock()
-            mock_client_cls.return_value = mock_client
-            mock_client.results.return_value = iter([mock_result])
+        self.mock_client_cls.return_value.results.return_value = [mock_result]
 
-            client = ArxivClient()
-            metadata = client.fetch("2301.00001")
+        client = ArxivClient()
+        metadata = client.fetch("2301.00001")
 
         assert isinstance(metadata, dict)
         assert metadata["title"] == "Test Paper"
@@ -48,14 +50,11 @@ class TestArxivClientFetch:
         assert metadata["arxiv_id"] == "2301.00001"
 
     def test_raises_on_empty_results(self) -> None:
-        with patch("src.services.arxiv_client.arxiv.Client") as mock_client_cls:
-            mock_client = MagicMock()
-            mock_client_cls.return_value = mock_client
-            mock_client.results.return_value = iter([])
+        self.mock_client_cls.return_value.results.return_value = []
 
-            client = ArxivClient()
-            with pytest.raises(ValueError, match="not found"):
-                client.fetch("9999.99999")
+        client = ArxivClient()
+        with pytest.raises(ValueError, match="not found"):
+            client.fetch("9999.99999")
 
     @pytest.mark.parametrize(
         "url,expected_id",
@@ -68,12 +67,8 @@ class TestArxivClientFetch:
         ],
     )
     def test_normalises_arxiv_id_forms(self, url: str, expected_id: str) -> None:
-        from src.services.arxiv_client import extract_arxiv_id
-
         assert extract_arxiv_id(url) == expected_id
 
     def test_raises_on_non_arxiv_url(self) -> None:
-        from src.services.arxiv_client import extract_arxiv_id
-
         with pytest.raises(ValueError, match="Cannot extract"):
             extract_arxiv_id("https://example.com/paper.pdf")
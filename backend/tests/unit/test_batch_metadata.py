@@ -0,0 +1,196 @@
+"""Unit tests for the Gemini batch metadata service."""
+
+import threading
+import uuid
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import cast
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.genai import types as genai_types
+
+from src.models.batch_job import BatchJob
+from src.models.paper import Paper
+from src.schemas.paper import ExtractedMetadata
+from src.services import batch_metadata
+from src.services.batch_metadata import _apply_batch_results, _submit_chunks, _text_cache_key
+
+
+def _paper(title: str = "Paper") -> Paper:
+    return Paper(
+        id=uuid.uuid4(),
+        title=title,
+        authors=[],
+        abstract=None,
+        published_date=None,
+        drive_file_id=f"drive-{title}",
+        metadata_skip_reason=None,
+    )
+
+
+def _db_returning(papers: list[Paper]) -> MagicMock:
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = papers
+    return db
+
+
+def _response(abstract: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        error=None, response=SimpleNamespace(text=f'{{"abstract": "{abstract}"}}')
+    )
+
+
+def _succeeded_batch(responses: list[SimpleNamespace]) -> genai_types.BatchJob:
+    batch = SimpleNamespace(
+        state=SimpleNamespace(name="JOB_STATE_SUCCEEDED"),
+        dest=SimpleNamespace(inlined_responses=responses),
+    )
+    return cast(genai_types.BatchJob, batch)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches() -> Iterator[None]:
+    yield
+    batch_metadata._metadata_cache.clear()
+    batch_metadata._pending_text_keys.clear()
+
+
+class TestSubmitChunks:
+    def test_splits_one_batch_into_jobs_with_response_offsets(self) -> None:
+        papers = [_paper(f"P{i}") for i in range(5)]
+        ids = [str(p.id) for p in papers]
+        client = MagicMock()
+        client.batches.create.return_value.name = "batches/1"
+
+        with (
+            patch.object(batch_metadata, "_CHUNK_SIZE", 2),
+            patch.object(
+                batch_metadata, "_download_pdf_bytes", side_effect=lambda pid, p: (pid, b"%PDF")
+            ),
+            patch.object(
+                batch_metadata,
+                "_extract_first_pages_text",
+                side_effect=[(f"text {i}", 1) for i in range(5)],
+            ),
+        ):
+            jobs = _submit_chunks(ids, client, "model", _db_returning(papers))
+
+        assert client.batches.create.call_count == 1
+        assert len(client.batches.create.call_args.kwargs["src"]) == 5
+        assert [job.response_offset for job in jobs] == [0, 2, 4]
+        assert [job.paper_ids for job in jobs] == [ids[0:2], ids[2:4], ids[4:5]]
+        assert all(job.gemini_job_name == "batches/1" for job in jobs)
+
+    def test_resolves_cached_text_without_submitting_a_batch(self) -> None:
+        paper = _paper()
+        batch_metadata._cache_put(
+            _text_cache_key("Same Text"),
+            ExtractedMetadata(title=None, authors=["Alice"], date="2023-01-01", abstract="Abs"),
+        )
+        client = MagicMock()
+        db = _db_returning([paper])
+
+        with (
+            patch.object(batch_metadata, "_download_pdf_bytes", return_value=("", b"%PDF")),
+            patch.object(
+                batch_metadata, "_extract_first_pages_text", return_value=("same  text", 1)
+            ),
+        ):
+            jobs = _submit_chunks([str(paper.id)], client, "model", db)
+
+        assert jobs == []
+        client.batches.create.assert_not_called()
+        assert paper.authors == ["Alice"]
+        assert paper.abstract == "Abs"
+        assert db.commit.call_count == 1
+        assert batch_metadata._pending_text_keys == {}
+
+    def test_drops_pending_keys_when_batch_create_fails(self) -> None:
+        paper = _paper()
+        client = MagicMock()
+        client.batches.create.side_effect = RuntimeError("quota")
+
+        with (
+            patch.object(batch_metadata, "_download_pdf_bytes", return_value=("", b"%PDF")),
+            patch.object(batch_metadata, "_extract_first_pages_text", return_value=("text", 1)),
+            pytest.raises(RuntimeError),
+        ):
+            _submit_chunks([str(paper.id)], client, "model", _db_returning([paper]))
+
+        assert batch_metadata._pending_text_keys == {}
+
+
+class TestApplyBatchResults:
+    def test_applies_only_the_responses_at_the_jobs_offset(self) -> None:
+        first_job_papers = [_paper("A"), _paper("B")]
+        papers = [_paper("C"), _paper("D")]
+        job = BatchJob(
+            gemini_job_name="batches/1",
+            state="submitted",
+            paper_ids=[str(p.id) for p in papers],
+            papers_done=0,
+            response_offset=len(first_job_papers),
+        )
+        batch = _succeeded_batch([_response(x) for x in ["a", "b", "c", "d"]])
+
+        applied = _apply_batch_results(job, batch, _db_returning(papers))
+
+        assert applied == 2
+        assert [p.abstract for p in papers] == ["c", "d"]
+        assert job.state == "applied"
+
+    def test_drops_pending_keys_when_batch_failed(self) -> None:
+        paper = _paper()
+        batch_metadata._pending_text_keys[str(paper.id)] = "key"
+        job = BatchJob(gemini_job_name="batches/1", state="submitted", paper_ids=[str(paper.id)])
+        batch = cast(
+            genai_types.BatchJob, SimpleNamespace(state=SimpleNamespace(name="JOB_STATE_FAILED"))
+        )
+
+        assert _apply_batch_results(job, batch, _db_returning([paper])) == 0
+        assert job.state == "failed"
+        assert batch_metadata._pending_text_keys == {}
+
+
+class TestMetadataCache:
+    def test_evicts_least_recently_used_entry(self) -> None:
+        meta = ExtractedMetadata(title="T", authors=[], date=None, abstract=None)
+        with patch.object(batch_metadata, "_CACHE_MAX_ENTRIES", 2):
+            batch_metadata._cache_put("a", meta)
+            batch_metadata._cache_put("b", meta)
+            batch_metadata._cache_get("a")
+            batch_metadata._cache_put("c", meta)
+
+        assert list(batch_metadata._metadata_cache) == ["a", "c"]
+
+
+class TestPollThreadLifecycle:
+    @pytest.fixture(autouse=True)
+    def _reset_poll_state(self) -> Iterator[None]:
+        yield
+        batch_metadata._poll_thread = None
+        batch_metadata._poll_pending = False
+        batch_metadata._shutdown_event.clear()
+
+    def test_stop_loop_does_not_stop_polling_submitted_batches(self) -> None:
+        batch_metadata.stop_loop()
+
+        assert not batch_metadata._shutdown_event.is_set()
+        assert not batch_metadata.is_running()
+
+    def test_exiting_poll_thread_rechecks_when_jobs_arrive(self) -> None:
+        # Simulate this thread being the live poll thread that just saw no jobs.
+        batch_metadata._poll_thread = threading.current_thread()
+
+        batch_metadata._ensure_poll_thread(MagicMock(), MagicMock())
+
+        assert batch_metadata._should_keep_polling() is True
+        assert batch_metadata._should_keep_polling() is False
+        assert batch_metadata._poll_thread is None
+
+    def test_starts_a_new_poll_thread_after_the_old_one_exits(self) -> None:
+        with patch("src.services.batch_metadata.threading.Thread") as thread_cls:
+            batch_metadata._ensure_poll_thread(MagicMock(), MagicMock())
+
+        assert thread_cls.return_value.start.call_count == 1
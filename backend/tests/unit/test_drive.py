@@ -1,45 +1,134 @@
 """Unit tests for DriveService."""
 
+import os
+from collections.abc import Iterator
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.services import drive
 from src.services.drive import DriveService, DriveUploadError
 
 
 class TestDriveServiceUpload:
-    def _make_service(self) -> tuple[DriveService, MagicMock]:
-        mock_drive = MagicMock()
-        with patch("src.services.drive.DriveService._get_service", return_value=mock_drive):
-            svc = DriveService()
-        svc._service = mock_drive
-        return svc, mock_drive
+    mock_session: MagicMock
 
-    def test_returns_drive_upload_result_with_file_id_and_view_url(self) -> None:
-        svc, mock_drive = self._make_service()
-
-        mock_create = MagicMock()
-        mock_create.execute.return_value = {
-            "id": "file-abc-123",
-            "webViewLink": "https://drive.google.com/file/d/file-abc-123/view",
-        }
-        mock_drive.files.return_value.create.return_value = mock_create
+    @pytest.fixture(autouse=True)
+    def _patched_session(self) -> Iterator[None]:
+        with patch("src.services.drive._get_session") as get_session:
+            self.mock_session = get_session.return_value
+            yield
 
-        mock_perm = MagicMock()
-        mock_perm.execute.return_value = {}
-        mock_drive.permissions.return_value.create.return_value = mock_perm
+    def test_returns_drive_upload_result_with_file_id_and_view_url(self) -> None:
+        self.mock_session.post.return_value.json.return_value = {"id": "file-abc-123"}
 
-        result = svc.upload(b"%PDF fake", "paper.pdf")
+        result = DriveService().upload(b"%PDF fake", "paper.pdf")
 
         assert result["file_id"] == "file-abc-123"
         assert "drive.google.com" in result["view_url"]
+        # File create + permission grant, both on the shared session.
+        assert self.mock_session.post.call_count == 2
 
     def test_raises_drive_upload_error_on_api_failure(self) -> None:
-        svc, mock_drive = self._make_service()
-
-        mock_create = MagicMock()
-        mock_create.execute.side_effect = Exception("API quota exceeded")
-        mock_drive.files.return_value.create.return_value = mock_create
+        self.mock_session.post.side_effect = Exception("API quota exceeded")
 
         with pytest.raises(DriveUploadError, match="quota exceeded"):
-            svc.upload(b"%PDF fake", "paper.pdf")
+            DriveService().upload(b"%PDF fake", "paper.pdf")
+
+    def test_uploads_large_file_in_resumable_chunks(self) -> None:
+        started = MagicMock()
+        started.headers = {"Location": "https://upload.example/session-1"}
+        permission = MagicMock()
+        self.mock_session.post.side_effect = [started, permission]
+        first = MagicMock(status_code=308, headers={"Range": "bytes=0-3"})
+        second = MagicMock(status_code=308, headers={"Range": "bytes=0-7"})
+        done = MagicMock(status_code=200)
+        done.json.return_value = {"id": "file-big"}
+        self.mock_session.put.side_effect = [first, second, done]
+
+        with patch("src.services.drive._UPLOAD_CHUNK_SIZE", 4):
+            result = DriveService().upload(b"%PDF-12345", "big.pdf")
+
+        assert result["file_id"] == "file-big"
+        put_calls = self.mock_session.put.call_args_list
+        ranges = [c.kwargs["headers"]["Content-Range"] for c in put_calls]
+        assert ranges == ["bytes 0-3/10", "bytes 4-7/10", "bytes 8-9/10"]
+
+    def test_gives_up_when_resumable_upload_stops_progressing(self) -> None:
+        started = MagicMock()
+        started.headers = {"Location": "https://upload.example/session-1"}
+        self.mock_session.post.return_value = started
+        self.mock_session.put.return_value = MagicMock(
+            status_code=308, headers={"Range": "bytes=0-3"}
+        )
+
+        with (
+            patch("src.services.drive._UPLOAD_CHUNK_SIZE", 4),
+            pytest.raises(DriveUploadError, match="no progress"),
+        ):
+            DriveService().upload(b"%PDF-12345", "big.pdf")
+
+        # One PUT that advanced the offset, then _MAX_STALLED_CHUNKS that did not.
+        assert self.mock_session.put.call_count == 4
+
+
+class TestGetSession:
+    def test_rebuilds_session_when_token_file_changes(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        token = tmp_path / "token.json"
+        token.write_text("{}")
+        monkeypatch.setenv("GOOGLE_TOKEN_PATH", str(token))
+        monkeypatch.setattr(drive, "_session", None)
+
+        with (
+            patch("src.services.drive._load_credentials"),
+            patch(
+                "src.services.drive.AuthorizedSession", side_effect=lambda creds: MagicMock()
+            ) as session_cls,
+        ):
+            first = drive._get_session()
+            assert drive._get_session() is first
+
+            os.utime(token, (0, 0))
+            assert drive._get_session() is not first
+
+        assert session_cls.call_count == 2
+
+
+class TestDriveServiceUploadMany:
+    def test_returns_results_and_errors_in_input_order(self) -> None:
+        def fake_create(self: DriveService, pdf_bytes: bytes, filename: str) -> str:
+            if filename == "bad.pdf":
+                raise Exception("upload failed")
+            return f"id-{filename}"
+
+        with (
+            patch.object(DriveService, "_create_file", fake_create),
+            patch.object(DriveService, "_share_publicly", return_value={}) as mock_share,
+        ):
+            results = DriveService().upload_many(
+                [(b"%PDF a", "a.pdf"), (b"%PDF b", "bad.pdf"), (b"%PDF c", "c.pdf")]
+            )
+
+        mock_share.assert_called_once_with(["id-a.pdf", "id-c.pdf"])
+        assert not isinstance(results[0], DriveUploadError)
+        assert results[0]["file_id"] == "id-a.pdf"
+        assert isinstance(results[1], DriveUploadError)
+        assert not isinstance(results[2], DriveUploadError)
+        assert results[2]["file_id"] == "id-c.pdf"
+
+    def test_marks_item_failed_when_permission_grant_fails(self) -> None:
+        with (
+            patch.object(DriveService, "_create_file", return_value="file-1"),
+            patch.object(
+                DriveService, "_share_publicly", return_value={"file-1": Exception("denied")}
+            ),
+            patch.object(DriveService, "delete") as delete,
+        ):
+            results = DriveService().upload_many([(b"%PDF a", "a.pdf")])
+
+        assert isinstance(results[0], DriveUploadError)
+        assert "denied" in str(results[0])
+        delete.assert_called_once_with("file-1")
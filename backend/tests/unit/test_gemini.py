@@ -0,0 +1,178 @@
+"""Unit tests for GeminiService and Gemini response parsing."""
+
+from collections.abc import Iterator
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.schemas.paper import ExtractedMetadata
+from src.services import gemini
+from src.services.gemini import GeminiService, _JsonObjectScanner, _page_text, _parse_metadata
+
+_EMPTY = ExtractedMetadata(title=None, authors=[], date=None, abstract=None)
+
+
+class TestParseMetadata:
+    def test_parses_fenced_json_object(self) -> None:
+        raw = '```json\n{"title": "T", "authors": ["A", "B"], "date": 2023, "abstract": ""}\n```'
+
+        meta = _parse_metadata(raw)
+
+        assert meta == ExtractedMetadata(title="T", authors=["A", "B"], date="2023", abstract=None)
+
+    @pytest.mark.parametrize("raw", ['```\n{"title": "T"}\n```', '```json\n{"title": "T"}'])
+    def test_strips_bare_and_unclosed_fences(self, raw: str) -> None:
+        assert _parse_metadata(raw).title == "T"
+
+    def test_ignores_prose_after_closing_fence(self) -> None:
+        raw = '```json\n{"title": "T", "authors": ["A"]}\n```\nHope this helps!'
+
+        meta = _parse_metadata(raw)
+
+        assert meta.title == "T"
+        assert meta.authors == ["A"]
+
+    def test_coerces_off_schema_authors_to_strings(self) -> None:
+        meta = _parse_metadata('{"title": "T", "authors": [1, 2]}')
+
+        assert meta.authors == ["1", "2"]
+
+    def test_drops_authors_that_are_not_a_list(self) -> None:
+        meta = _parse_metadata('{"title": "T", "authors": "Alice"}')
+
+        assert meta.title == "T"
+        assert meta.authors == []
+
+    @pytest.mark.parametrize("raw", ["not json", "[1, 2]", ""])
+    def test_returns_empty_metadata_for_unusable_replies(self, raw: str) -> None:
+        assert _parse_metadata(raw) == _EMPTY
+
+
+def _page(words: list[tuple[str, float]]) -> MagicMock:
+    page = MagicMock()
+    page.extract_words.return_value = [{"text": t, "bottom": b} for t, b in words]
+    return page
+
+
+class TestPageText:
+    def test_groups_words_into_lines_by_baseline(self) -> None:
+        page = _page(
+            [
+                ("Attention", 10.0),
+                ("Is", 15.0),  # exactly 5pt lower: still the same line
+                ("All", 15.5),
+                ("Ashish", 30.0),
+                ("Vaswani", 30.0),
+                ("Abstract", 50.0),
+            ]
+        )
+
+        assert _page_text(page) == "Attention Is All\nAshish Vaswani\nAbstract"
+
+    def test_returns_empty_string_for_page_without_words(self) -> None:
+        assert _page_text(_page([])) == ""
+
+
+def _feed_all(chunks: list[str]) -> tuple[str | None, int]:
+    """Feed *chunks* until an object completes; return it and the number of chunks fed."""
+    scanner = _JsonObjectScanner()
+    for n, chunk in enumerate(chunks, 1):
+        found = scanner.feed(chunk)
+        if found is not None:
+            return found, n
+    return None, len(chunks)
+
+
+class TestJsonObjectScanner:
+    def test_returns_object_once_it_closes_across_chunks(self) -> None:
+        assert _feed_all(['{"title": ', '"T"', "}", "trailing"]) == ('{"title": "T"}', 3)
+
+    def test_ignores_braces_inside_strings(self) -> None:
+        found, _ = _feed_all(['{"title": "a } b', ' { c"', ', "x": {"y": 1}}'])
+
+        assert found == '{"title": "a } b { c", "x": {"y": 1}}'
+
+    def test_handles_escaped_quotes_split_across_chunks(self) -> None:
+        found, _ = _feed_all(['{"title": "say \\', '"}\\" here"', "}"])
+
+        assert found == '{"title": "say \\"}\\" here"}'
+
+    def test_skips_prose_before_the_object(self) -> None:
+        found, _ = _feed_all(['Sure, here is "the" JSON:\n```json\n{"a"', ": 1}\n```"])
+
+        assert found == '{"a": 1}'
+
+    def test_returns_none_without_a_complete_object(self) -> None:
+        scanner = _JsonObjectScanner()
+
+        assert scanner.feed('{"title": "T"') is None
+        assert scanner.text() == '{"title": "T"'
+
+
+def _stream(chunks: list[str], *, then_fail: bool = False) -> Iterator[SimpleNamespace]:
+    for chunk in chunks:
+        yield SimpleNamespace(text=chunk)
+    if then_fail:
+        raise AssertionError("stream read past the end of the JSON object")
+
+
+class TestGeminiServiceExtractMetadata:
+    @pytest.fixture(autouse=True)
+    def _env(self, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        monkeypatch.setenv("GEMINI_API_KEY", "key")
+        monkeypatch.setenv("GEMINI_PDF_MODEL", "model")
+        yield
+        gemini._metadata_cache.clear()
+
+    def _client(self, chunks: list[str], *, then_fail: bool = False) -> MagicMock:
+        client = MagicMock()
+        client.files.upload.return_value.name = "files/1"
+        client.models.generate_content_stream.return_value = _stream(chunks, then_fail=then_fail)
+        return client
+
+    def test_stops_streaming_once_the_object_is_complete(self) -> None:
+        client = self._client(['{"title": "T", ', '"authors": ["A"]}'], then_fail=True)
+
+        with patch("src.services.gemini.genai.Client", return_value=client):
+            meta = GeminiService().extract_metadata(b"%PDF one")
+
+        assert meta.title == "T"
+        assert meta.authors == ["A"]
+        client.files.delete.assert_called_once_with(name="files/1")
+
+    def test_falls_back_to_full_text_without_a_complete_object(self) -> None:
+        client = self._client(["Here you go:\n", '{"title": "T"'])
+
+        with (
+            patch("src.services.gemini.genai.Client", return_value=client),
+            patch.object(gemini, "_parse_metadata", return_value=_EMPTY) as parse,
+        ):
+            GeminiService().extract_metadata(b"%PDF two")
+
+        parse.assert_called_once_with('Here you go:\n{"title": "T"')
+
+    def test_serves_repeat_extractions_from_the_cache(self) -> None:
+        client = self._client(['{"title": "T"}'])
+
+        with patch("src.services.gemini.genai.Client", return_value=client) as client_cls:
+            first = GeminiService().extract_metadata(b"%PDF same")
+            first.authors.append("mutated")
+            second = GeminiService().extract_metadata(b"%PDF same")
+
+        assert client_cls.call_count == 1
+        assert second.title == "T"
+        assert second.authors == []
+
+    def test_bypasses_the_cache_when_asked_and_refreshes_it(self) -> None:
+        stale = self._client(['{"title": "Old"}'])
+        fresh = self._client(['{"title": "New"}'])
+
+        with patch("src.services.gemini.genai.Client", side_effect=[stale, fresh]) as client_cls:
+            GeminiService().extract_metadata(b"%PDF retry")
+            retried = GeminiService().extract_metadata(b"%PDF retry", use_cache=False)
+            cached = GeminiService().extract_metadata(b"%PDF retry")
+
+        assert client_cls.call_count == 2
+        assert retried.title == "New"
+        assert cached.title == "New"
@@ -4,142 +4,166 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.models.paper import Paper
 from src.services.drive import DriveUploadError
-from src.services.ingestion import DuplicateError, IngestionService
-from src.services.types import DriveUploadResult, PaperMetadata
-
-
-def _paper_metadata(
-    title: str | None = "Test Paper",
-    authors: list[str] | None = None,
-    abstract: str | None = "Some abstract.",
-    arxiv_id: str | None = None,
-) -> PaperMetadata:
-    return PaperMetadata(
-        title=title,
-        authors=authors if authors is not None else ["Alice"],
-        published_date=None,
-        abstract=abstract,
-        arxiv_id=arxiv_id,
-    )
-
-
-def _drive_result() -> DriveUploadResult:
-    return {
-        "file_id": "drive-file-123",
-        "view_url": "https://drive.google.com/file/d/drive-file-123/view",
-    }
-
-
-def _make_db(first_results: list[object] | None = None) -> MagicMock:
-    """Return a MagicMock db session.
-
-    *first_results* controls successive return values of .query().filter().first().
-    Defaults to all-None (no duplicates found).
-    """
-    db = MagicMock()
-    if first_results is None:
-        db.query.return_value.filter.return_value.first.return_value = None
-    else:
-        db.query.return_value.filter.return_value.first.side_effect = first_results
-    return db
-
-
-def _make_service(
-    mock_arxiv: MagicMock,
-    mock_pdf: MagicMock,
-    mock_drive: MagicMock,
-) -> IngestionService:
-    with (
-        patch("src.services.ingestion.ArxivClient", return_value=mock_arxiv),
-        patch("src.services.ingestion.PdfParser", return_value=mock_pdf),
-        patch("src.services.ingestion.DriveService", return_value=mock_drive),
-    ):
-        return IngestionService()
+from src.services.ingestion import DuplicateError
+from src.services.types import DriveUploadResult
+from tests.unit._fixtures import DbFactory, PaperMetadataFactory, ServiceFactory
 
 
 class TestIngestionServiceIngest:
-    def test_detects_arxiv_url_and_delegates_to_arxiv_client(self) -> None:
+    def test_detects_arxiv_url_and_delegates_to_arxiv_client(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_arxiv = MagicMock()
-        mock_arxiv.fetch.return_value = _paper_metadata(arxiv_id="2301.00001")
+        mock_arxiv.fetch.return_value = paper_metadata_factory(arxiv_id="2301.00001")
         mock_pdf = MagicMock()
-        mock_pdf.download_and_extract.return_value = (_paper_metadata(), b"%PDF")
+        mock_pdf.download.return_value = b"%PDF"
         mock_drive = MagicMock()
-        mock_drive.upload.return_value = _drive_result()
-
-        svc = _make_service(mock_arxiv, mock_pdf, mock_drive)
-        svc.ingest("https://arxiv.org/abs/2301.00001", _make_db())
-
-        mock_arxiv.fetch.assert_called_once()
-        # PdfParser downloads the PDF bytes for arXiv papers too
-        mock_pdf.download_and_extract.assert_called_once()
-
-    def test_detects_plain_pdf_url_and_delegates_to_pdf_parser(self) -> None:
+        mock_drive.upload.return_value = drive_result
+
+        svc = service_factory(mock_arxiv, mock_pdf, mock_drive)
+        svc.ingest("https://arxiv.org/abs/2301.00001", db_factory())
+
+        assert mock_arxiv.fetch.call_count == 1
+        # PdfParser downloads the PDF bytes for arXiv papers too, but metadata
+        # comes from the arXiv API.
+        mock_pdf.download.assert_called_once_with("https://arxiv.org/pdf/2301.00001")
+        mock_pdf.extract_metadata.assert_not_called()
+        assert mock_drive.upload.call_args.kwargs["filename"] == "2301.00001.pdf"
+
+    def test_detects_plain_pdf_url_and_delegates_to_pdf_parser(
+        self,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_arxiv = MagicMock()
         mock_pdf = MagicMock()
-        mock_pdf.download_and_extract.return_value = (_paper_metadata(), b"%PDF")
+        mock_pdf.download.return_value = b"%PDF"
         mock_drive = MagicMock()
-        mock_drive.upload.return_value = _drive_result()
+        mock_drive.upload.return_value = drive_result
 
-        svc = _make_service(mock_arxiv, mock_pdf, mock_drive)
-        svc.ingest("https://example.com/paper.pdf", _make_db())
+        svc = service_factory(mock_arxiv, mock_pdf, mock_drive)
+        svc.ingest("https://example.com/paper.pdf", db_factory())
 
-        mock_pdf.download_and_extract.assert_called_once()
+        assert mock_pdf.download.call_count == 1
+        mock_pdf.extract_metadata.assert_called_once_with(mock_pdf.open.return_value)
         mock_arxiv.fetch.assert_not_called()
 
-    def test_raises_duplicate_error_when_submission_url_already_exists(self) -> None:
+    def test_sanitises_title_for_drive_filename(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_arxiv = MagicMock()
         mock_pdf = MagicMock()
+        mock_pdf.download.return_value = b"%PDF"
+        mock_pdf.extract_metadata.return_value = paper_metadata_factory(
+            title="Attention: All/You Need? "
+        )
         mock_drive = MagicMock()
+        mock_drive.upload.return_value = drive_result
 
-        # First .first() returns an existing paper (submission_url match).
-        db = _make_db(first_results=[MagicMock()])
+        svc = service_factory(mock_arxiv, mock_pdf, mock_drive)
+        svc.ingest("https://example.com/paper.pdf", db_factory())
 
-        svc = _make_service(mock_arxiv, mock_pdf, mock_drive)
-        with pytest.raises(DuplicateError):
-            svc.ingest("https://example.com/paper.pdf", db)
+        assert mock_drive.upload.call_args.kwargs["filename"] == "Attention_ All_You Need_.pdf"
 
-    def test_raises_duplicate_error_when_arxiv_id_already_exists(self) -> None:
+    def test_raises_duplicate_error_when_arxiv_id_already_exists(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_arxiv = MagicMock()
-        mock_arxiv.fetch.return_value = _paper_metadata(arxiv_id="2301.00001")
+        mock_arxiv.fetch.return_value = paper_metadata_factory(arxiv_id="2301.00001")
         mock_pdf = MagicMock()
         mock_drive = MagicMock()
 
-        # First .first() → None (no submission_url match), second → existing (arxiv_id match).
-        db = _make_db(first_results=[None, MagicMock()])
+        # The combined submission_url / arxiv_id lookup finds an existing paper.
+        db = db_factory(first_results=[object()])
 
-        svc = _make_service(mock_arxiv, mock_pdf, mock_drive)
+        svc = service_factory(mock_arxiv, mock_pdf, mock_drive)
         with pytest.raises(DuplicateError):
             svc.ingest("https://arxiv.org/abs/2301.00001", db)
 
-    def test_persists_paper_and_note_on_success(self) -> None:
+    def test_persists_paper_and_note_on_success(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_arxiv = MagicMock()
-        mock_arxiv.fetch.return_value = _paper_metadata(arxiv_id="2301.99999")
+        mock_arxiv.fetch.return_value = paper_metadata_factory(arxiv_id="2301.99999")
         mock_pdf = MagicMock()
-        mock_pdf.download_and_extract.return_value = (_paper_metadata(), b"%PDF")
+        mock_pdf.download.return_value = b"%PDF"
         mock_drive = MagicMock()
-        mock_drive.upload.return_value = _drive_result()
+        mock_drive.upload.return_value = drive_result
 
-        db = _make_db()
-        svc = _make_service(mock_arxiv, mock_pdf, mock_drive)
+        db = db_factory()
+        svc = service_factory(mock_arxiv, mock_pdf, mock_drive)
         svc.ingest("https://arxiv.org/abs/2301.99999", db)
 
         # db.add called twice (Paper + Note), then flush + commit.
         assert db.add.call_count == 2
-        db.flush.assert_called_once()
-        db.commit.assert_called_once()
-
-    def test_does_not_commit_on_drive_failure(self) -> None:
+        assert db.flush.call_count == 1
+        assert db.commit.call_count == 1
+
+    def test_does_not_commit_on_drive_failure(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_arxiv = MagicMock()
-        mock_arxiv.fetch.return_value = _paper_metadata(arxiv_id="2301.88888")
+        mock_arxiv.fetch.return_value = paper_metadata_factory(arxiv_id="2301.88888")
         mock_pdf = MagicMock()
-        mock_pdf.download_and_extract.return_value = (_paper_metadata(), b"%PDF")
+        mock_pdf.download.return_value = b"%PDF"
         mock_drive = MagicMock()
         mock_drive.upload.side_effect = DriveUploadError("Drive unavailable")
 
-        db = _make_db()
-        svc = _make_service(mock_arxiv, mock_pdf, mock_drive)
+        db = db_factory()
+        svc = service_factory(mock_arxiv, mock_pdf, mock_drive)
         with pytest.raises(DriveUploadError):
             svc.ingest("https://arxiv.org/abs/2301.88888", db)
 
         db.commit.assert_not_called()
+
+
+class TestIngestionServiceIngestMany:
+    def test_returns_papers_and_errors_in_input_order(
+        self, db_factory: DbFactory, service_factory: ServiceFactory
+    ) -> None:
+        ok_paper = MagicMock(spec_set=Paper)
+        dup = DuplicateError("Paper already exists in your library")
+
+        def fake_ingest(url: str, db: MagicMock) -> MagicMock:
+            if "dup" in url:
+                raise dup
+            return ok_paper
+
+        sessions: list[MagicMock] = []
+
+        def session_factory() -> MagicMock:
+            db = db_factory()
+            sessions.append(db)
+            return db
+
+        svc = service_factory(MagicMock(), MagicMock(), MagicMock())
+        with patch.object(svc, "ingest", side_effect=fake_ingest):
+            results = svc.ingest_many(
+                ["https://example.com/a.pdf", "https://example.com/dup.pdf"], session_factory
+            )
+
+        assert results == [ok_paper, dup]
+        # One session per URL, each closed after use.
+        assert len(sessions) == 2
+        assert all(db.close.call_count == 1 for db in sessions)
@@ -0,0 +1,34 @@
+"""Unit tests for IngestionService duplicate detection shared by ingest and ingest_local."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.ingestion import DuplicateError
+from tests.unit._fixtures import FAKE_PATH, PDF_BYTES, DbFactory, ServiceFactory
+
+
+class TestIngestionServiceDuplicates:
+    @pytest.mark.parametrize(
+        ("method", "args"),
+        [
+            ("ingest", ("https://example.com/paper.pdf",)),
+            ("ingest_local", (PDF_BYTES, FAKE_PATH)),
+        ],
+    )
+    def test_raises_duplicate_error_when_submission_url_already_exists(
+        self,
+        method: str,
+        args: tuple[object, ...],
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
+        # First .first() returns an existing paper (submission_url match).
+        db = db_factory(first_results=[object()])
+        mock_drive = MagicMock()
+        svc = service_factory(MagicMock(), MagicMock(), mock_drive)
+
+        with pytest.raises(DuplicateError):
+            getattr(svc, method)(*args, db)
+
+        mock_drive.upload.assert_not_called()
@@ -1,93 +1,130 @@
 """Unit tests for IngestionService.ingest_local()."""
 
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
+from sqlalchemy.exc import OperationalError
 
 from src.services.drive import DriveUploadError
-from src.services.ingestion import DuplicateError, IngestionService
-from src.services.types import DriveUploadResult, PaperMetadata
+from src.services.ingestion import DuplicateError
+from src.services.types import DriveUploadResult
+from tests.unit._fixtures import (
+    FAKE_PATH,
+    PDF_BYTES,
+    DbFactory,
+    PaperMetadataFactory,
+    ServiceFactory,
+)
 
-_PDF_BYTES = b"%PDF-1.4 fake"
-
-
-def _paper_metadata(title: str | None = "Local Paper") -> PaperMetadata:
-    return PaperMetadata(
-        title=title,
-        authors=["Alice"],
-        published_date=None,
-        abstract=None,
-        arxiv_id=None,
-    )
-
-
-def _drive_result() -> DriveUploadResult:
-    return {
-        "file_id": "drive-file-456",
-        "view_url": "https://drive.google.com/file/d/drive-file-456/view",
-    }
-
-
-def _make_db(first_results: list[object] | None = None) -> MagicMock:
-    db = MagicMock()
-    if first_results is None:
-        db.query.return_value.filter.return_value.first.return_value = None
-    else:
-        db.query.return_value.filter.return_value.first.side_effect = first_results
-    return db
 
+class TestIngestionServiceIngestLocal:
+    def test_imports_new_pdf_and_persists_paper_and_note(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
+        mock_pdf = MagicMock()
+        mock_pdf.extract_metadata.return_value = paper_metadata_factory()
+        mock_drive = MagicMock()
+        mock_drive.upload.return_value = drive_result
+
+        db = db_factory()
+        svc = service_factory(MagicMock(), mock_pdf, mock_drive)
+        svc.ingest_local(PDF_BYTES, FAKE_PATH, db)
+
+        # Metadata and full text share one parsed PdfContext.
+        mock_pdf.open.assert_called_once_with(PDF_BYTES)
+        ctx = mock_pdf.open.return_value.__enter__.return_value
+        mock_pdf.extract_metadata.assert_called_once_with(ctx)
+        mock_pdf.extract_full_text.assert_called_once_with(ctx)
+        assert mock_drive.upload.call_count == 1
+        assert db.add.call_count == 2
+        assert db.flush.call_count == 1
+        assert db.commit.call_count == 1
+
+    def test_renames_upload_to_title_after_parsing(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
+        mock_pdf = MagicMock()
+        mock_pdf.extract_metadata.return_value = paper_metadata_factory(title="Local Paper")
+        mock_drive = MagicMock()
+        mock_drive.upload.return_value = drive_result
 
-def _make_service(
-    mock_pdf: MagicMock,
-    mock_drive: MagicMock,
-) -> IngestionService:
-    mock_arxiv = MagicMock()
-    with (
-        patch("src.services.ingestion.ArxivClient", return_value=mock_arxiv),
-        patch("src.services.ingestion.PdfParser", return_value=mock_pdf),
-        patch("src.services.ingestion.DriveService", return_value=mock_drive),
-    ):
-        return IngestionService()
+        svc = service_factory(MagicMock(), mock_pdf, mock_drive)
+        svc.ingest_local(PDF_BYTES, Path("/tmp/scan_001.pdf"), db_factory())
 
+        assert mock_drive.upload.call_args.kwargs["filename"] == "scan_001.pdf"
+        mock_drive.rename.assert_called_once_with("drive-file-123", "Local Paper.pdf")
 
-class TestIngestionServiceIngestLocal:
-    def test_imports_new_pdf_and_persists_paper_and_note(self) -> None:
+    def test_deletes_upload_when_title_already_exists(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_pdf = MagicMock()
-        mock_pdf.extract_metadata.return_value = _paper_metadata()
+        mock_pdf.extract_metadata.return_value = paper_metadata_factory()
         mock_drive = MagicMock()
-        mock_drive.upload.return_value = _drive_result()
+        mock_drive.upload.return_value = drive_result
 
-        db = _make_db()
-        svc = _make_service(mock_pdf, mock_drive)
-        svc.ingest_local(_PDF_BYTES, Path("/tmp/paper.pdf"), db)
+        # No submission_url match, then an existing paper with the same title.
+        db = db_factory(first_results=[None, object()])
+        svc = service_factory(MagicMock(), mock_pdf, mock_drive)
 
-        mock_pdf.extract_metadata.assert_called_once_with(_PDF_BYTES)
-        mock_drive.upload.assert_called_once()
-        assert db.add.call_count == 2
-        db.flush.assert_called_once()
-        db.commit.assert_called_once()
+        with pytest.raises(DuplicateError):
+            svc.ingest_local(PDF_BYTES, FAKE_PATH, db)
 
-    def test_raises_duplicate_error_when_submission_url_already_exists(self) -> None:
+        mock_drive.delete.assert_called_once_with("drive-file-123")
+        db.commit.assert_not_called()
+
+    def test_deletes_upload_when_title_lookup_fails(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        drive_result: DriveUploadResult,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_pdf = MagicMock()
+        mock_pdf.extract_metadata.return_value = paper_metadata_factory()
         mock_drive = MagicMock()
+        mock_drive.upload.return_value = drive_result
 
-        db = _make_db(first_results=[MagicMock()])
-        svc = _make_service(mock_pdf, mock_drive)
+        db = db_factory()
+        db.query.return_value.filter.return_value.first.side_effect = [
+            None,
+            OperationalError("SELECT", {}, Exception("connection lost")),
+        ]
+        svc = service_factory(MagicMock(), mock_pdf, mock_drive)
 
-        with pytest.raises(DuplicateError):
-            svc.ingest_local(_PDF_BYTES, Path("/tmp/paper.pdf"), db)
+        with pytest.raises(OperationalError):
+            svc.ingest_local(PDF_BYTES, FAKE_PATH, db)
+
+        mock_drive.delete.assert_called_once_with("drive-file-123")
+        db.commit.assert_not_called()
 
-    def test_does_not_commit_on_drive_failure(self) -> None:
+    def test_does_not_commit_on_drive_failure(
+        self,
+        paper_metadata_factory: PaperMetadataFactory,
+        db_factory: DbFactory,
+        service_factory: ServiceFactory,
+    ) -> None:
         mock_pdf = MagicMock()
-        mock_pdf.extract_metadata.return_value = _paper_metadata()
+        mock_pdf.extract_metadata.return_value = paper_metadata_factory()
         mock_drive = MagicMock()
         mock_drive.upload.side_effect = DriveUploadError("Drive unavailable")
 
-        db = _make_db()
-        svc = _make_service(mock_pdf, mock_drive)
+        db = db_factory()
+        svc = service_factory(MagicMock(), mock_pdf, mock_drive)
 
         with pytest.raises(DriveUploadError):
-            svc.ingest_local(_PDF_BYTES, Path("/tmp/paper.pdf"), db)
+            svc.ingest_local(PDF_BYTES, FAKE_PATH, db)
 
         db.commit.assert_not_called()
@@ -1,59 +1,58 @@
 """Unit tests for NotesService."""
 
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from unittest.mock import MagicMock
 
 import pytest
 
+from src.models.paper import Paper
 from src.services.notes import NotesService, NotFoundError
 
+_PAPER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+_FIXED_TS = datetime(2026, 1, 1, 12, 0, 0)
 
-def _make_paper_id() -> uuid.UUID:
-    return uuid.uuid4()
 
+@dataclass
+class _StubNote:
+    """The Note attributes NotesService.upsert reads and writes."""
 
-def _mock_note(content: str = "", paper_id: uuid.UUID | None = None) -> MagicMock:
-    note = MagicMock()
-    note.content = content
-    note.updated_at = datetime(2026, 1, 1, 12, 0, 0)
-    note.paper_id = paper_id or _make_paper_id()
-    return note
+    content: str = ""
+    updated_at: datetime = _FIXED_TS
+    paper_id: uuid.UUID = _PAPER_ID
 
 
 class TestNotesServiceUpsert:
-    def test_updates_content_on_existing_note(self) -> None:
-        paper_id = _make_paper_id()
-        existing_note = _mock_note(content="old content", paper_id=paper_id)
+    def test_updates_content_on_existing_note(self, db: MagicMock) -> None:
+        paper_id = _PAPER_ID
+        existing_note = _StubNote(content="old content", paper_id=paper_id)
 
-        db = MagicMock()
         db.query.return_value.filter.return_value.first.side_effect = [
-            MagicMock(),  # paper found
+            MagicMock(spec_set=Paper),  # paper found
             existing_note,  # note found
         ]
 
         result = NotesService().upsert(paper_id, "new content", db)
 
         assert existing_note.content == "new content"
-        db.commit.assert_called_once()
+        assert db.commit.call_count == 1
         db.refresh.assert_called_once_with(existing_note)
         assert result.content == existing_note.content
 
-    def test_raises_not_found_error_when_paper_does_not_exist(self) -> None:
-        paper_id = _make_paper_id()
-        db = MagicMock()
+    def test_raises_not_found_error_when_paper_does_not_exist(self, db: MagicMock) -> None:
+        paper_id = _PAPER_ID
         db.query.return_value.filter.return_value.first.return_value = None
 
         with pytest.raises(NotFoundError):
             NotesService().upsert(paper_id, "some content", db)
 
-    def test_returns_note_response_with_updated_at(self) -> None:
-        paper_id = _make_paper_id()
-        existing_note = _mock_note(content="", paper_id=paper_id)
+    def test_returns_note_response_with_updated_at(self, db: MagicMock) -> None:
+        paper_id = _PAPER_ID
+        existing_note = _StubNote(content="", paper_id=paper_id)
 
-        db = MagicMock()
         db.query.return_value.filter.return_value.first.side_effect = [
-            MagicMock(),  # paper found
+            MagicMock(spec_set=Paper),  # paper found
             existing_note,  # note found
         ]
 
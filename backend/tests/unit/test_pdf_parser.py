@@ -1,5 +1,7 @@
 """Unit tests for PdfParser."""
 
+from contextlib import AbstractContextManager
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -9,101 +11,126 @@ from src.services.pdf_parser import PdfParser
 _PDF_MAGIC = b"%PDF-1.4 fake content"
 
 
-def _make_pdfplumber_mock(
-    metadata: dict[str, object],
-    first_page_text: str = "",
-) -> MagicMock:
-    """Return a mock that works as a context manager yielding a pdf with given metadata."""
-    page = MagicMock()
-    page.extract_text.return_value = first_page_text
-    inner = MagicMock()
-    inner.metadata = metadata
-    inner.pages = [page]
+class _FakePdf:
+    """Minimal pdfplumber document with the given metadata and a one-page body."""
+
+    def __init__(self, metadata: dict[str, object], first_page_text: str = "") -> None:
+        self.metadata = metadata
+        region = SimpleNamespace(extract_text=lambda: first_page_text)
+        page = SimpleNamespace(
+            bbox=(0, 0, 612, 792),
+            width=612,
+            height=792,
+            extract_text=lambda: first_page_text,
+            crop=lambda bbox: region,
+        )
+        self.pages = [page]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "_FakePdf":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _make_pdf(text: str, mediabox: tuple[int, int, int, int]) -> bytes:
+    """Build a real one-page PDF with *text* near the top of *mediabox*."""
+    x0, y0, x1, y1 = mediabox
+    stream = f"BT /F1 24 Tf {x0 + 72} {y1 - 72} Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [{x0} {y0} {x1} {y1}] "
+        "/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>".encode(),
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    return out + b"startxref\n%d\n%%%%EOF\n" % xref
+
+
+def _patch_stream(response: MagicMock) -> AbstractContextManager[MagicMock]:
+    """Patch the shared httpx client's stream() so its context yields *response*."""
     ctx = MagicMock()
-    ctx.__enter__ = MagicMock(return_value=inner)
-    ctx.__exit__ = MagicMock(return_value=False)
-    return ctx
+    ctx.__enter__.return_value = response
+    return patch("src.services.pdf_parser._HTTP_CLIENT.stream", return_value=ctx)
 
 
-class TestPdfParserDownloadAndExtract:
-    def test_returns_metadata_and_bytes_from_mocked_response(self) -> None:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "application/pdf"}
-        mock_response.content = _PDF_MAGIC
-
-        mock_ctx = _make_pdfplumber_mock(
-            {
-                "Title": "My Paper",
-                "Author": "Jane Doe",
-            }
-        )
+def _make_response(content_type: str, body: bytes) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {"content-type": content_type}
+    response.iter_bytes.return_value = iter([body])
+    return response
+
 
+@pytest.fixture(scope="module")
+def parser() -> PdfParser:
+    return PdfParser()
+
+
+class TestPdfParserDownloadAndExtract:
+    @pytest.mark.parametrize(
+        ("meta", "page_text", "exp_title", "exp_authors"),
+        [
+            ({"Title": "My Paper", "Author": "Jane Doe"}, "", "My Paper", ["Jane Doe"]),
+            # No document title: fall back to the first line of the first page.
+            ({}, "Attention Is All You Need\nAuthors...", "Attention Is All You Need", []),
+            ({}, "", None, []),
+        ],
+    )
+    def test_returns_metadata_and_bytes(
+        self,
+        meta: dict[str, object],
+        page_text: str,
+        exp_title: str | None,
+        exp_authors: list[str],
+        parser: PdfParser,
+    ) -> None:
         with (
-            patch("src.services.pdf_parser.httpx.get", return_value=mock_response),
-            patch("src.services.pdf_parser.pdfplumber.open", return_value=mock_ctx),
+            _patch_stream(_make_response("application/pdf", _PDF_MAGIC)),
+            patch(
+                "src.services.pdf_parser.pdfplumber.open", return_value=_FakePdf(meta, page_text)
+            ),
         ):
-            parser = PdfParser()
             metadata, pdf_bytes = parser.download_and_extract("https://example.com/paper.pdf")
 
         assert pdf_bytes == _PDF_MAGIC
-        assert metadata["title"] == "My Paper"
-        assert metadata["authors"] == ["Jane Doe"]
-
-    def test_raises_on_non_pdf_content_type(self) -> None:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "text/html"}
-        mock_response.content = b"<html></html>"  # no PDF magic bytes
+        assert metadata["title"] == exp_title
+        assert metadata["authors"] == exp_authors
+        assert metadata["abstract"] is None
 
-        with patch("src.services.pdf_parser.httpx.get", return_value=mock_response):
-            parser = PdfParser()
-            with pytest.raises(ValueError, match="not a PDF"):
-                parser.download_and_extract("https://example.com/page")
+    def test_raises_on_non_pdf_content_type(self, parser: PdfParser) -> None:
+        # No PDF magic bytes either.
+        response = _make_response("text/html", b"<html></html>")
+        with _patch_stream(response), pytest.raises(ValueError, match="not a PDF"):
+            parser.download_and_extract("https://example.com/page")
 
-    def test_raises_on_http_error(self) -> None:
+    def test_raises_on_http_error(self, parser: PdfParser) -> None:
         mock_response = MagicMock()
         mock_response.status_code = 404
         mock_response.raise_for_status.side_effect = Exception("404")
 
-        with patch("src.services.pdf_parser.httpx.get", return_value=mock_response):
-            parser = PdfParser()
-            with pytest.raises(Exception, match="404"):
-                parser.download_and_extract("https://example.com/missing.pdf")
+        with _patch_stream(mock_response), pytest.raises(Exception, match="404"):
+            parser.download_and_extract("https://example.com/missing.pdf")
 
-    def test_falls_back_to_first_page_text_when_no_metadata_title(self) -> None:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "application/pdf"}
-        mock_response.content = _PDF_MAGIC
-
-        mock_ctx = _make_pdfplumber_mock({}, first_page_text="Attention Is All You Need\nAuthors...")
-
-        with (
-            patch("src.services.pdf_parser.httpx.get", return_value=mock_response),
-            patch("src.services.pdf_parser.pdfplumber.open", return_value=mock_ctx),
-        ):
-            parser = PdfParser()
-            metadata, _ = parser.download_and_extract("https://example.com/paper.pdf")
-
-        assert metadata["title"] == "Attention Is All You Need"
-        assert metadata["authors"] == []
-        assert metadata["abstract"] is None
-
-    def test_returns_none_title_when_no_metadata_and_no_page_text(self) -> None:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "application/pdf"}
-        mock_response.content = _PDF_MAGIC
 
-        mock_ctx = _make_pdfplumber_mock({}, first_page_text="")
-
-        with (
-            patch("src.services.pdf_parser.httpx.get", return_value=mock_response),
-            patch("src.services.pdf_parser.pdfplumber.open", return_value=mock_ctx),
-        ):
-            parser = PdfParser()
-            metadata, _ = parser.download_and_extract("https://example.com/paper.pdf")
+class TestPdfParserExtractMetadata:
+    @pytest.mark.parametrize("mediabox", [(0, 0, 612, 792), (20, 20, 632, 812)])
+    def test_falls_back_to_header_text_for_any_mediabox_origin(
+        self, mediabox: tuple[int, int, int, int], parser: PdfParser
+    ) -> None:
+        metadata = parser.extract_metadata(_make_pdf("My Great Title", mediabox))
 
-        assert metadata["title"] is None
-        assert metadata["authors"] == []
+        assert metadata["title"] == "My Great Title"
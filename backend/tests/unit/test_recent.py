@@ -4,10 +4,11 @@ from datetime import UTC, datetime
 from unittest.mock import MagicMock
 
 from src.api.recent import get_recent
+from src.models.paper import Paper
 
 
 def _mock_paper(title: str = "Paper") -> MagicMock:
-    p = MagicMock()
+    p = MagicMock(spec_set=Paper)
     p.title = title
     p.authors = ["Author One"]
     p.added_at = datetime(2024, 1, 1, tzinfo=UTC)
@@ -60,4 +61,4 @@ class TestGetRecentLimit:
 
         # The second .filter() call (for `since`) should have been made
         limit_chain = db.query.return_value.filter.return_value.order_by.return_value.limit.return_value
-        limit_chain.filter.assert_called_once()
+        assert limit_chain.filter.call_count == 1
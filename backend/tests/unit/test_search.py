@@ -1,67 +1,95 @@
 """Unit tests for SearchService."""
 
-from unittest.mock import MagicMock
+from typing import cast
 
+from sqlalchemy.orm import Session
+
+from src.models.paper import Paper
 from src.services.search import SearchService
 
+# The service never looks inside papers, so identity-only sentinels suffice.
+_PAPER_A = object()
+_PAPER_B = object()
+
+
+class FakeQuery:
+    """Stand-in for a Session and its Query chain: every builder method returns self."""
+
+    __slots__ = ("papers", "total", "filter_called")
+
+    def __init__(self, papers: list[object], total: int) -> None:
+        self.papers = papers
+        self.total = total
+        self.filter_called = 0
+
+    def query(self, *args: object) -> "FakeQuery":
+        return self
+
+    def filter(self, *args: object) -> "FakeQuery":
+        self.filter_called += 1
+        return self
+
+    def order_by(self, *args: object) -> "FakeQuery":
+        return self
+
+    def offset(self, *args: object) -> "FakeQuery":
+        return self
+
+    def limit(self, *args: object) -> "FakeQuery":
+        return self
+
+    def count(self) -> int:
+        return self.total
+
+    def all(self) -> list[object]:
+        return self.papers
+
 
-def _mock_paper(title: str = "Paper") -> MagicMock:
-    p = MagicMock()
-    p.title = title
-    return p
+def _make_db_returning(papers: list[object], total: int | None = None) -> FakeQuery:
+    """Fake db whose query chain returns *papers* and *total* from paginated calls."""
+    return FakeQuery(papers, total if total is not None else len(papers))
 
 
-def _make_db_returning(papers: list[MagicMock], total: int | None = None) -> MagicMock:
-    """Mock db whose query chain returns *papers* and *total* from paginated calls."""
-    count = total if total is not None else len(papers)
-    db = MagicMock()
-    # No-filter path: order_by().count() and order_by().offset().limit().all()
-    no_filter = db.query.return_value.order_by.return_value
-    no_filter.count.return_value = count
-    no_filter.offset.return_value.limit.return_value.all.return_value = papers
-    # Filter path: filter().order_by().count() and filter().order_by().offset().limit().all()
-    with_filter = db.query.return_value.filter.return_value.order_by.return_value
-    with_filter.count.return_value = count
-    with_filter.offset.return_value.limit.return_value.all.return_value = papers
-    return db
+def _search(query: str | None, db: FakeQuery) -> tuple[list[Paper], int]:
+    return SearchService().search(query, cast(Session, db))
 
 
 class TestSearchServiceSearch:
     def test_returns_all_papers_when_query_is_none(self) -> None:
-        papers = [_mock_paper("A"), _mock_paper("B")]
+        papers = [_PAPER_A, _PAPER_B]
         db = _make_db_returning(papers)
 
-        result_papers, total = SearchService().search(None, db)
+        result_papers, total = _search(None, db)
 
         assert result_papers == papers
         assert total == len(papers)
         # Should NOT call filter (no tsquery)
-        db.query.return_value.filter.assert_not_called()
+        assert db.filter_called == 0
 
     def test_returns_all_papers_when_query_is_empty_string(self) -> None:
-        papers = [_mock_paper()]
+        papers = [_PAPER_A]
         db = _make_db_returning(papers)
 
-        result_papers, total = SearchService().search("", db)
+        result_papers, total = _search("", db)
 
         assert result_papers == papers
         assert total == len(papers)
-        db.query.return_value.filter.assert_not_called()
+        assert db.filter_called == 0
 
     def test_applies_tsquery_filter_for_non_empty_query(self) -> None:
-        papers = [_mock_paper("Transformer paper")]
+        papers = [_PAPER_A]
         db = _make_db_returning(papers)
 
-        result_papers, total = SearchService().search("transformer", db)
+        result_papers, total = _search("transformer", db)
 
         assert result_papers == papers
         assert total == len(papers)
-        db.query.return_value.filter.assert_called_once()
+        assert db.filter_called == 1
 
     def test_returns_empty_list_when_no_match(self) -> None:
         db = _make_db_returning([])
 
-        result_papers, total = SearchService().search("zzznomatch", db)
+        result_papers, total = _search("zzznomatch", db)
 
         assert result_papers == []
         assert total == 0